@@ -0,0 +1,192 @@
+import hashlib
+import pickle
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from functools import wraps
+from flask import current_app, request
+
+
+def _new_version():
+    """Version aléatoire : une version perdue ne peut pas en redonner une ancienne"""
+    return uuid.uuid4().hex[:12]
+
+
+class LRUBackend:
+    """Cache en mémoire du processus, borné en nombre d'entrées"""
+
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires = item
+            if expires is not None and expires < time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._data[key] = (value, time.time() + ttl if ttl else None)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def versions(self, keys):
+        # Les versions sont hors de l'LRU : elles ne sont jamais évincées
+        with self._lock:
+            return [self._versions.setdefault(key, _new_version()) for key in keys]
+
+    def bump(self, key):
+        with self._lock:
+            self._versions[key] = _new_version()
+
+
+class LocalSharedBackend(LRUBackend):
+    """Doublure locale d'un cache partagé : les valeurs sont sérialisées
+
+    Même comportement qu'un backend réseau (copies indépendantes des
+    valeurs), utilisable dans les tests à la place de RedisBackend.
+    """
+
+    def get(self, key):
+        value = super().get(key)
+        return pickle.loads(value) if isinstance(value, bytes) else value
+
+    def set(self, key, value, ttl=None):
+        super().set(key, pickle.dumps(value), ttl)
+
+
+class RedisBackend:
+    """Cache partagé entre workers, adossé à Redis (dépendance optionnelle)"""
+
+    def __init__(self, url, prefix='species-tracker:'):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError('CACHE_BACKEND=redis nécessite le paquet redis')
+        self._client = redis.Redis.from_url(url)
+        self._prefix = prefix
+
+    def get(self, key):
+        value = self._client.get(self._prefix + key)
+        return pickle.loads(value) if value is not None else None
+
+    def set(self, key, value, ttl=None):
+        self._client.set(self._prefix + key, pickle.dumps(value), ex=ttl)
+
+    def versions(self, keys):
+        keys = [self._prefix + key for key in keys]
+        values = self._client.mget(keys)
+        if None in values:
+            # Version absente (jamais écrite ou évincée) : nouvelle valeur, jamais une ancienne
+            for key, value in zip(keys, values):
+                if value is None:
+                    self._client.set(key, _new_version(), nx=True)
+            values = self._client.mget(keys)
+        return [value.decode() for value in values]
+
+    def bump(self, key):
+        self._client.set(self._prefix + key, _new_version())
+
+
+class ResponseCache:
+    """Cache de réponses GET invalidé par compteurs de version
+
+    Chaque réponse dépend d'espaces de noms (``species``, ``observations``,
+    ``conservation``...). Les écritures remplacent la version de leur
+    espace par une valeur aléatoire : les clés changent et les anciennes
+    entrées ne sont plus lues. Une version perdue (éviction, redémarrage
+    de Redis) est recréée avec une nouvelle valeur, jamais une ancienne.
+    """
+
+    def __init__(self, backend, ttl=300):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    def versions(self, namespaces):
+        return self.backend.versions([f'version:{ns}' for ns in namespaces])
+
+    def bump(self, *namespaces):
+        for namespace in namespaces:
+            self.backend.bump(f'version:{namespace}')
+
+    def hit_ratio(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else None
+
+    def _key(self, namespaces):
+        args = '&'.join(f'{k}={v}' for k, v in sorted(request.args.items(multi=True)))
+        versions = '.'.join(str(v) for v in self.versions(namespaces))
+        return f'response:{request.endpoint}:{versions}:{args}'
+
+    def handle(self, namespaces, view, args, kwargs):
+        key = self._key(namespaces)
+        entry = self.backend.get(key)
+        if entry is None:
+            self.misses += 1
+            response = current_app.make_response(view(*args, **kwargs))
+            # Les réponses en streaming ou en erreur ne sont pas mises en cache
+            if response.status_code != 200 or response.is_streamed:
+                return response
+            body = response.get_data()
+            entry = {
+                'body': body,
+                'mimetype': response.mimetype,
+                'headers': [(k, v) for k, v in response.headers if k.lower().startswith('x-')],
+                'etag': hashlib.sha1(body).hexdigest(),
+                'last_modified': time.time()
+            }
+            self.backend.set(key, entry, self.ttl)
+        else:
+            self.hits += 1
+
+        response = current_app.response_class(entry['body'], mimetype=entry['mimetype'])
+        for header, value in entry['headers']:
+            response.headers[header] = value
+        response.set_etag(entry['etag'])
+        response.last_modified = entry['last_modified']
+        # Le navigateur conserve la réponse mais la revalide à chaque fois
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response.make_conditional(request)
+
+
+def cached(*namespaces):
+    """Mettre en cache une vue GET dépendant des espaces de noms donnés"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            cache = current_app.extensions.get('response_cache')
+            if cache is None or request.method != 'GET':
+                return view(*args, **kwargs)
+            return cache.handle(namespaces, view, args, kwargs)
+        return wrapper
+    return decorator
+
+
+def invalidate(*namespaces):
+    """Invalider les réponses en cache dépendant de ces espaces de noms"""
+    cache = current_app.extensions.get('response_cache')
+    if cache is not None:
+        cache.bump(*namespaces)
+
+
+def init_cache(app, backend=None):
+    """Attacher le cache de réponses à l'application"""
+    if backend is None:
+        if app.config['CACHE_BACKEND'] == 'redis':
+            backend = RedisBackend(app.config['CACHE_URL'])
+        else:
+            backend = LRUBackend(app.config['CACHE_MAX_ENTRIES'])
+    app.extensions['response_cache'] = ResponseCache(backend, app.config['CACHE_TTL'])
@@ -0,0 +1,114 @@
+import zlib
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Statuts dont le corps n'est jamais compressé
+_NO_BODY_STATUSES = {204, 304}
+
+
+class _Gzip:
+    def __init__(self, level):
+        # wbits=31 : format gzip (en-tête et CRC) plutôt que zlib brut
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def flush(self):
+        # Vidage synchronisé : le client peut décoder chaque morceau sans attendre la fin
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class _Brotli:
+    def __init__(self, quality):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data):
+        return self._compressor.process(data)
+
+    def flush(self):
+        return self._compressor.flush()
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+def _compressor(encoding, config):
+    if encoding == 'br':
+        return _Brotli(config['COMPRESS_BROTLI_QUALITY'])
+    return _Gzip(config['COMPRESS_LEVEL'])
+
+
+def negotiate(accept_encodings):
+    """Encodage retenu d'après Accept-Encoding (brotli préféré à qualité égale), ou None"""
+    available = ['br', 'gzip'] if brotli is not None else ['gzip']
+    best, best_quality = None, 0
+    for encoding in available:
+        quality = accept_encodings[encoding]
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def _stream(chunks, compressor):
+    try:
+        for chunk in chunks:
+            data = compressor.compress(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+
+
+def _compress(response):
+    config = current_app.config
+    if response.mimetype not in config['COMPRESS_MIMETYPES']:
+        return response
+    # La représentation dépend de l'en-tête de la requête, y compris non compressée ou en 304
+    response.vary.add('Accept-Encoding')
+    if (response.status_code < 200 or response.status_code in _NO_BODY_STATUSES
+            or response.direct_passthrough or 'Content-Encoding' in response.headers):
+        return response
+
+    encoding = negotiate(request.accept_encodings)
+    if encoding is None:
+        return response
+
+    if response.is_streamed:
+        compressor = _compressor(encoding, config)
+        response.response = _stream(response.iter_encoded(), compressor)
+        response.headers.pop('Content-Length', None)
+    else:
+        body = response.get_data()
+        if len(body) < config['COMPRESS_MIN_SIZE']:
+            return response
+        compressor = _compressor(encoding, config)
+        response.set_data(compressor.compress(body) + compressor.finish())
+    response.headers['Content-Encoding'] = encoding
+
+    # Même contenu, octets différents : l'ETag devient faible et reste
+    # comparable à If-None-Match (comparaison faible) pour les réponses 304
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def init_compression(app):
+    """Compression gzip/brotli des réponses (COMPRESS_LEVEL=0 pour la désactiver)
+
+    À appeler avant les autres extensions : les fonctions after_request
+    s'exécutent dans l'ordre inverse de leur enregistrement, la compression
+    passe donc en dernier, sur le corps définitif.
+    """
+    if app.config['COMPRESS_LEVEL'] > 0:
+        app.after_request(_compress)
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from datetime import timedelta
 
 class Config:
@@ -8,5 +9,97 @@ class Config:
         'postgresql://user:password@db:5432/speciesdb'
     )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Pool de connexions, par processus : prévoir workers x (pool_size + max_overflow)
+    # connexions au maximum côté PostgreSQL
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': int(os.getenv('DB_POOL_SIZE', 5)),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 10)),
+        'pool_timeout': int(os.getenv('DB_POOL_TIMEOUT', 30)),
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': os.getenv('DB_POOL_PRE_PING', 'true').lower() in ('1', 'true', 'yes')
+    }
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'your-jwt-secret-key')
-    JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1)
\ No newline at end of file
+    JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1)
+
+    # Journalisation : niveau, format ('json' ou 'text'), taille de la file
+    # et proportion des messages DEBUG conservés
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+    LOG_FORMAT = os.getenv('LOG_FORMAT', 'json')
+    LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', 10000))
+    LOG_DEBUG_SAMPLE_RATE = float(os.getenv('LOG_DEBUG_SAMPLE_RATE', 0.01))
+
+    # Sondes /health et /ready : délai du SELECT 1 (s) et seuils de dégradation
+    HEALTH_DB_TIMEOUT = float(os.getenv('HEALTH_DB_TIMEOUT', 2))
+    HEALTH_DB_SLOW_MS = float(os.getenv('HEALTH_DB_SLOW_MS', 250))
+    HEALTH_MAX_QUEUE_DEPTH = int(os.getenv('HEALTH_MAX_QUEUE_DEPTH', 100))
+
+    # Profilage SQL par requête (en-têtes X-Query-Count/Server-Timing, log des dépassements)
+    SQL_PROFILING = os.getenv('SQL_PROFILING', 'false').lower() in ('1', 'true', 'yes')
+    SQL_QUERY_BUDGET = int(os.getenv('SQL_QUERY_BUDGET', 20))
+    SQL_TIME_BUDGET_MS = float(os.getenv('SQL_TIME_BUDGET_MS', 200))
+    SQL_SLOW_QUERY_MS = float(os.getenv('SQL_SLOW_QUERY_MS', 100))
+    # Une même requête répétée autant de fois dans une requête HTTP signale un N+1
+    SQL_REPEAT_THRESHOLD = int(os.getenv('SQL_REPEAT_THRESHOLD', 5))
+
+    # Sérialiseur JSON des réponses : 'auto' (orjson s'il est installé), 'orjson' ou 'stdlib'
+    JSON_SERIALIZER = os.getenv('JSON_SERIALIZER', 'auto')
+
+    # Compression des réponses : gzip, ou brotli si le paquet est installé (COMPRESS_LEVEL=0 la désactive)
+    COMPRESS_LEVEL = int(os.getenv('COMPRESS_LEVEL', 6))
+    COMPRESS_BROTLI_QUALITY = int(os.getenv('COMPRESS_BROTLI_QUALITY', 4))
+    COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', 1024))
+    COMPRESS_MIMETYPES = os.getenv(
+        'COMPRESS_MIMETYPES', 'application/json,application/x-ndjson,text/csv,text/plain,text/html'
+    ).split(',')
+
+    # Mots de passe : méthode werkzeug et coût (les hachages plus anciens sont refaits à la connexion)
+    PASSWORD_HASH_METHOD = os.getenv('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:260000')
+    # Calculs simultanés par processus et demandes en attente au-delà desquelles la connexion renvoie 503
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', 2))
+    PASSWORD_HASH_QUEUE_SIZE = int(os.getenv('PASSWORD_HASH_QUEUE_SIZE', 32))
+    PASSWORD_HASH_TIMEOUT = float(os.getenv('PASSWORD_HASH_TIMEOUT', 10))
+
+    # Pagination par clé et streaming des listes
+    PAGE_SIZE_MAX = int(os.getenv('PAGE_SIZE_MAX', 1000))
+    STREAM_BATCH_SIZE = int(os.getenv('STREAM_BATCH_SIZE', 1000))
+
+    # Exports (csv, xlsx, parquet) : lignes lues par lots depuis un curseur côté serveur
+    EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', 10000))
+
+    # Nombre maximal d'observations par envoi groupé
+    BATCH_MAX_ITEMS = int(os.getenv('BATCH_MAX_ITEMS', 50000))
+
+    # Nombre maximal d'écritures du journal lues par appel à /api/sync
+    SYNC_MAX_CHANGES = int(os.getenv('SYNC_MAX_CHANGES', 5000))
+
+    # Flux d'événements /api/stream : broker 'local' (par processus) ou 'postgres' (LISTEN/NOTIFY)
+    EVENT_BROKER = os.getenv('EVENT_BROKER', 'local')
+    STREAM_HEARTBEAT = int(os.getenv('STREAM_HEARTBEAT', 15))
+    STREAM_QUEUE_SIZE = int(os.getenv('STREAM_QUEUE_SIZE', 100))
+    # Connexions au flux par worker : avec gthread chacune occupe un thread,
+    # la moitié des GUNICORN_THREADS reste donc libre pour les autres requêtes
+    STREAM_MAX_SUBSCRIBERS = int(os.getenv(
+        'STREAM_MAX_SUBSCRIBERS',
+        100 if os.getenv('GUNICORN_WORKER_CLASS', 'gthread') == 'gevent'
+        else max(1, int(os.getenv('GUNICORN_THREADS', 8)) // 2)
+    ))
+    # Durée de validité des jetons de flux (le temps d'ouvrir la connexion)
+    STREAM_TOKEN_EXPIRES = timedelta(seconds=int(os.getenv('STREAM_TOKEN_EXPIRES', 60)))
+    # Ids d'observations par événement, et compteurs d'espèces par événement
+    # stats : les charges restent sous la limite de NOTIFY (8000 octets)
+    STREAM_EVENT_MAX_ITEMS = int(os.getenv('STREAM_EVENT_MAX_ITEMS', 20))
+    STREAM_STATS_MAX_SPECIES = int(os.getenv('STREAM_STATS_MAX_SPECIES', 100))
+
+    # Imports de fichiers (lots et traitement en arrière-plan)
+    IMPORT_CHUNK_SIZE = int(os.getenv('IMPORT_CHUNK_SIZE', 5000))
+    IMPORT_WORKERS = int(os.getenv('IMPORT_WORKERS', 2))
+    IMPORT_SPOOL_DIR = os.getenv('IMPORT_SPOOL_DIR', os.path.join(tempfile.gettempdir(), 'imports'))
+    IMPORT_JOB_TTL = int(os.getenv('IMPORT_JOB_TTL', 3600))
+    # Import en cours sans progression depuis ce délai (worker arrêté) : signalé en échec
+    IMPORT_JOB_STALE_AFTER = int(os.getenv('IMPORT_JOB_STALE_AFTER', 900))
+
+    # Cache des réponses GET : 'local' (LRU par processus) ou 'redis' (partagé)
+    CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'local')
+    CACHE_URL = os.getenv('CACHE_URL', 'redis://localhost:6379/0')
+    CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', 512))
+    CACHE_TTL = int(os.getenv('CACHE_TTL', 300))
\ No newline at end of file
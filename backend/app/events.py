@@ -0,0 +1,156 @@
+import itertools
+import json
+import logging
+import select
+import threading
+import time
+from collections import deque
+from flask import current_app
+from app import db
+
+log = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = 'species_tracker_events'
+# Taille maximale d'une charge NOTIFY acceptée par PostgreSQL
+NOTIFY_MAX_BYTES = 7999
+
+
+def notify_payload(name, data):
+    """Charge NOTIFY d'un événement ; ValueError au-delà de NOTIFY_MAX_BYTES
+
+    Les événements ne doivent porter que des ids et des compteurs en
+    nombre borné : les abonnés relisent les lignes elles-mêmes.
+    """
+    payload = json.dumps({'event': name, 'data': data}, default=str)
+    if len(payload.encode()) > NOTIFY_MAX_BYTES:
+        raise ValueError(f'Événement {name} trop volumineux pour NOTIFY')
+    return payload
+
+
+class Subscription:
+    """File d'événements d'un abonné, bornée : un client trop lent perd les plus anciens"""
+
+    def __init__(self, max_events):
+        self._events = deque(maxlen=max_events)
+        self._condition = threading.Condition()
+
+    def put(self, event):
+        with self._condition:
+            self._events.append(event)
+            self._condition.notify()
+
+    def get(self, timeout=None):
+        """Prochain événement, ou None si rien n'arrive avant ``timeout`` secondes"""
+        with self._condition:
+            if not self._events:
+                self._condition.wait(timeout)
+            return self._events.popleft() if self._events else None
+
+
+class LocalEventBroker:
+    """Diffusion en mémoire : une publication est copiée vers chaque abonné du processus
+
+    Remplaçable par un broker partagé exposant la même interface
+    (``publish``, ``subscribe``, ``unsubscribe``, ``subscriber_count``).
+    """
+
+    def __init__(self, queue_size=100):
+        self.queue_size = queue_size
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def publish(self, name, data):
+        self._fan_out({'event': name, 'data': data})
+
+    def _fan_out(self, event):
+        event = dict(event, id=next(self._ids))
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            subscription.put(event)
+
+    def subscribe(self):
+        subscription = Subscription(self.queue_size)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscribers)
+
+
+class PostgresEventBroker(LocalEventBroker):
+    """Diffusion entre workers via LISTEN/NOTIFY
+
+    Chaque processus garde une connexion dédiée en écoute et redistribue
+    les notifications à ses abonnés locaux.
+    """
+
+    def __init__(self, app, queue_size=100):
+        super().__init__(queue_size)
+        self.app = app
+        self._listener = None
+
+    def subscribe(self):
+        # Écoute démarrée au premier abonné, dans le processus worker
+        # (un thread lancé avant le fork du serveur n'y survivrait pas)
+        with self._lock:
+            if self._listener is None:
+                self._listener = threading.Thread(target=self._listen, name='event-listener', daemon=True)
+                self._listener.start()
+        return super().subscribe()
+
+    def publish(self, name, data):
+        payload = notify_payload(name, data)
+        with db.engine.begin() as connection:
+            connection.execute(
+                db.text('SELECT pg_notify(:channel, :payload)'),
+                {'channel': NOTIFY_CHANNEL, 'payload': payload}
+            )
+
+    def _listen(self):
+        while True:
+            connection = None
+            try:
+                # Connexion retirée du pool : elle reste en écoute
+                with self.app.app_context():
+                    pooled = db.engine.raw_connection()
+                    pooled.detach()
+                connection = pooled.dbapi_connection
+                connection.autocommit = True
+                connection.cursor().execute(f'LISTEN {NOTIFY_CHANNEL}')
+                while True:
+                    if select.select([connection], [], [], 5) == ([], [], []):
+                        continue
+                    connection.poll()
+                    while connection.notifies:
+                        notification = connection.notifies.pop(0)
+                        self._fan_out(json.loads(notification.payload))
+            except Exception:
+                log.exception("Event listener error")
+                if connection is not None:
+                    connection.close()
+                time.sleep(5)
+
+
+def publish(name, data):
+    """Publier un événement aux abonnés de /api/stream (sans effet si aucun broker)"""
+    broker = current_app.extensions.get('event_broker')
+    if broker is not None:
+        broker.publish(name, data)
+
+
+def init_events(app, broker=None):
+    """Attacher le broker d'événements à l'application"""
+    if broker is None:
+        if app.config['EVENT_BROKER'] == 'postgres':
+            broker = PostgresEventBroker(app, app.config['STREAM_QUEUE_SIZE'])
+        else:
+            broker = LocalEventBroker(app.config['STREAM_QUEUE_SIZE'])
+    app.extensions['event_broker'] = broker
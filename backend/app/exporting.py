@@ -0,0 +1,159 @@
+import csv
+import io
+import tempfile
+from datetime import date
+from flask import Response, current_app, send_file, stream_with_context
+from openpyxl import Workbook
+from sqlalchemy import Date, DateTime, Float, Integer
+from app import db
+from app.importing import CONSERVATION_COLUMN_MAPPING
+from app.models import ConservationPlan, Observation
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'parquet': 'application/vnd.apache.parquet'
+}
+# Nombre maximal de lignes d'une feuille Excel (en-tête compris)
+XLSX_MAX_ROWS = 1048576
+
+
+def _inverse(mapping):
+    """En-tête de fichier pour chaque colonne (premier libellé accepté à l'import)"""
+    headers = {}
+    for header, column in mapping.items():
+        headers.setdefault(column, header)
+    return headers
+
+
+# En-têtes relus tels quels par l'import des plans (/api/conservation/import)
+CONSERVATION_EXPORT_COLUMNS = [
+    (header, getattr(ConservationPlan, column))
+    for column, header in _inverse(CONSERVATION_COLUMN_MAPPING).items()
+]
+# Colonnes des observations ; uuid n'est renseigné que pour l'envoi groupé
+OBSERVATION_EXPORT_COLUMNS = [
+    ('id', Observation.id),
+    ('uuid', Observation.client_uuid),
+    ('species_id', Observation.species_id),
+    ('latitude', Observation.latitude),
+    ('longitude', Observation.longitude),
+    ('observed_at', Observation.observed_at),
+    ('notes', Observation.notes)
+]
+
+
+def parse_format(args):
+    """Format demandé via ?format= (csv par défaut)
+
+    Lève ValueError avec un message destiné au client si le format est
+    inconnu ou indisponible.
+    """
+    fmt = args.get('format', 'csv').lower()
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"format doit valoir {', '.join(EXPORT_FORMATS)}")
+    if fmt == 'parquet' and pyarrow is None:
+        raise ValueError('Export parquet indisponible (paquet pyarrow non installé)')
+    return fmt
+
+
+def _batches(query):
+    """Lignes lues par lots de EXPORT_BATCH_SIZE via un curseur côté serveur"""
+    batch_size = current_app.config['EXPORT_BATCH_SIZE']
+    result = db.session.execute(query.statement.execution_options(yield_per=batch_size))
+    try:
+        yield from result.partitions()
+    finally:
+        result.close()
+
+
+def _csv(headers, query):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(headers)
+    for rows in _batches(query):
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def _xlsx(headers, query, output):
+    # Mode write_only : les lignes sont écrites au fil de l'eau dans un fichier temporaire
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(headers)
+    count = 1
+    try:
+        for rows in _batches(query):
+            count += len(rows)
+            if count > XLSX_MAX_ROWS:
+                raise ValueError('Trop de lignes pour un fichier Excel, utilisez format=csv ou parquet')
+            for row in rows:
+                sheet.append(tuple(row))
+    except Exception:
+        # Libérer le fichier temporaire de la feuille
+        sheet.close()
+        raise
+    workbook.save(output)
+
+
+def _arrow_type(column):
+    if isinstance(column.type, DateTime):
+        return pyarrow.timestamp('us')
+    if isinstance(column.type, Date):
+        return pyarrow.date32()
+    if isinstance(column.type, Integer):
+        return pyarrow.int64()
+    if isinstance(column.type, Float):
+        return pyarrow.float64()
+    return pyarrow.string()
+
+
+def _parquet(headers, columns, query, output):
+    # Un groupe de lignes parquet par lot : seul le lot courant est en mémoire
+    schema = pyarrow.schema([(header, _arrow_type(column)) for header, column in zip(headers, columns)])
+    with pyarrow.parquet.ParquetWriter(output, schema) as writer:
+        for rows in _batches(query):
+            arrays = [pyarrow.array(values, type=field.type) for values, field in zip(zip(*rows), schema)]
+            writer.write_batch(pyarrow.RecordBatch.from_arrays(arrays, schema=schema))
+
+
+def export_response(query, id_column, export_columns, fmt, name):
+    """Réponse d'export : CSV en streaming, XLSX ou parquet via un fichier temporaire
+
+    ``query`` est une requête déjà filtrée ; elle est restreinte aux colonnes
+    d'``export_columns`` et triée par ``id_column``. La mémoire utilisée
+    dépend de EXPORT_BATCH_SIZE et non du nombre de lignes.
+    Lève ValueError pour un fichier XLSX dépassant la limite d'Excel.
+    """
+    headers = [header for header, _ in export_columns]
+    columns = [column for _, column in export_columns]
+    query = query.with_entities(*columns).order_by(id_column)
+    filename = f'{name}_{date.today():%Y%m%d}.{fmt}'
+
+    if fmt == 'csv':
+        response = Response(stream_with_context(_csv(headers, query)), mimetype=EXPORT_FORMATS[fmt])
+        response.headers['Content-Disposition'] = f'attachment; filename={filename}'
+        return response
+
+    output = tempfile.TemporaryFile()
+    try:
+        if fmt == 'xlsx':
+            _xlsx(headers, query, output)
+        else:
+            _parquet(headers, columns, query, output)
+    except Exception:
+        output.close()
+        raise
+    output.seek(0)
+    return send_file(output, mimetype=EXPORT_FORMATS[fmt], as_attachment=True, download_name=filename)
+
@@ -0,0 +1,160 @@
+import numpy as np
+from sqlalchemy import and_, or_
+
+# Geohash entier : 30 bits de longitude et 30 bits de latitude entrelacés
+# (longitude en premier, comme un geohash classique) sur 60 bits.
+# Un préfixe de précision p (p caractères base32) correspond aux 5*p bits
+# de poids fort, soit un intervalle contigu de cellules à précision 12.
+CELL_BITS = 30
+MAX_PRECISION = 12
+MAX_COVER_CELLS = 64
+MAX_CLUSTER_CELLS = 1024
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+# Précision geohash maximale utilisée pour chaque niveau de zoom Leaflet
+_ZOOM_PRECISION = [1, 1, 2, 2, 2, 3, 3, 3, 4, 4, 4, 5, 5, 5, 6, 6, 6, 7, 7, 7, 8, 8, 8]
+
+
+def _spread(v):
+    """Intercaler des zéros entre les bits d'entiers 30 bits (vectorisé)"""
+    v = v & np.uint64(0x3FFFFFFF)
+    v = (v | (v << np.uint64(16))) & np.uint64(0x0000FFFF0000FFFF)
+    v = (v | (v << np.uint64(8))) & np.uint64(0x00FF00FF00FF00FF)
+    v = (v | (v << np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    v = (v | (v << np.uint64(2))) & np.uint64(0x3333333333333333)
+    v = (v | (v << np.uint64(1))) & np.uint64(0x5555555555555555)
+    return v
+
+
+def _interleave(i, j):
+    return (_spread(i) << np.uint64(1)) | _spread(j)
+
+
+def encode_many(latitudes, longitudes):
+    """Calculer les cellules geohash (60 bits) d'un ensemble de points"""
+    lat = np.asarray(latitudes, dtype=np.float64)
+    lng = np.asarray(longitudes, dtype=np.float64)
+    scale = float(1 << CELL_BITS)
+    top = (1 << CELL_BITS) - 1
+    i = np.clip(np.floor((lng + 180.0) / 360.0 * scale), 0, top).astype(np.uint64)
+    j = np.clip(np.floor((lat + 90.0) / 180.0 * scale), 0, top).astype(np.uint64)
+    return _interleave(i, j).astype(np.int64)
+
+
+def encode(latitude, longitude):
+    """Calculer la cellule geohash d'un point"""
+    return int(encode_many([latitude], [longitude])[0])
+
+
+def cell_to_geohash(cell, precision):
+    """Convertir un préfixe de cellule en geohash base32 lisible"""
+    chars = []
+    for _ in range(precision):
+        chars.append(BASE32[cell & 31])
+        cell >>= 5
+    return ''.join(reversed(chars))
+
+
+def zoom_to_precision(zoom):
+    """Précision geohash adaptée à un niveau de zoom de carte"""
+    if zoom is None:
+        return 8
+    return _ZOOM_PRECISION[max(0, min(int(zoom), len(_ZOOM_PRECISION) - 1))]
+
+
+def parse_bbox(value):
+    """Analyser un paramètre bbox=minLng,minLat,maxLng,maxLat
+
+    Lève ValueError si le format ou les bornes sont invalides.
+    """
+    parts = [float(p) for p in value.split(',')]
+    if len(parts) != 4:
+        raise ValueError('bbox doit contenir 4 valeurs')
+    min_lng, min_lat, max_lng, max_lat = parts
+    if not (-90 <= min_lat <= max_lat <= 90):
+        raise ValueError('latitudes de bbox invalides')
+    if not (-180 <= min_lng <= 180 and -180 <= max_lng <= 180):
+        raise ValueError('longitudes de bbox invalides')
+    return min_lng, min_lat, max_lng, max_lat
+
+
+def parse_zoom(value):
+    """Analyser un paramètre zoom optionnel (0-22)"""
+    if value in (None, ''):
+        return None
+    zoom = int(value)
+    if not 0 <= zoom <= 22:
+        raise ValueError('zoom doit être compris entre 0 et 22')
+    return zoom
+
+
+def split_bbox(bbox):
+    """Découper une bbox qui traverse l'antiméridien en deux boîtes"""
+    min_lng, min_lat, max_lng, max_lat = bbox
+    if min_lng <= max_lng:
+        return [bbox]
+    return [(min_lng, min_lat, 180.0, max_lat), (-180.0, min_lat, max_lng, max_lat)]
+
+
+def _cell_span(bbox, precision):
+    lng_bits = (5 * precision + 1) // 2
+    lat_bits = (5 * precision) // 2
+    min_lng, min_lat, max_lng, max_lat = bbox
+    i0 = min(int((min_lng + 180.0) / 360.0 * (1 << lng_bits)), (1 << lng_bits) - 1)
+    i1 = min(int((max_lng + 180.0) / 360.0 * (1 << lng_bits)), (1 << lng_bits) - 1)
+    j0 = min(int((min_lat + 90.0) / 180.0 * (1 << lat_bits)), (1 << lat_bits) - 1)
+    j1 = min(int((max_lat + 90.0) / 180.0 * (1 << lat_bits)), (1 << lat_bits) - 1)
+    return lng_bits, lat_bits, (i0, i1), (j0, j1)
+
+
+def covering_precision(bbox, max_precision=MAX_PRECISION, max_cells=MAX_COVER_CELLS):
+    """Plus grande précision (≤ max_precision) couvrant la bbox en max_cells cellules"""
+    best = 1
+    for precision in range(1, max_precision + 1):
+        _, _, (i0, i1), (j0, j1) = _cell_span(bbox, precision)
+        if (i1 - i0 + 1) * (j1 - j0 + 1) > max_cells:
+            break
+        best = precision
+    return best
+
+
+def cell_ranges(bbox, precision):
+    """Intervalles [début, fin) de cellules 60 bits couvrant la bbox
+
+    Les préfixes consécutifs dans l'ordre de Morton sont fusionnés pour
+    limiter le nombre de conditions envoyées à la base.
+    """
+    lng_bits, lat_bits, (i0, i1), (j0, j1) = _cell_span(bbox, precision)
+    ii, jj = np.meshgrid(np.arange(i0, i1 + 1, dtype=np.uint64),
+                         np.arange(j0, j1 + 1, dtype=np.uint64))
+    ii = ii.ravel() << np.uint64(CELL_BITS - lng_bits)
+    jj = jj.ravel() << np.uint64(CELL_BITS - lat_bits)
+    shift = 2 * CELL_BITS - 5 * precision
+    prefixes = np.unique(_interleave(ii, jj) >> np.uint64(shift))
+
+    ranges = []
+    for prefix in prefixes.tolist():
+        start, end = prefix << shift, (prefix + 1) << shift
+        if ranges and ranges[-1][1] == start:
+            ranges[-1][1] = end
+        else:
+            ranges.append([start, end])
+    return [tuple(r) for r in ranges]
+
+
+def bbox_clause(bbox, cell_column, lat_column, lng_column, zoom=None):
+    """Condition SQL restreignant une requête à une bbox via l'index de cellules
+
+    L'index sur la colonne de cellules sert au pré-filtrage, puis les
+    coordonnées exactes éliminent les points en bordure de cellule.
+    """
+    clauses = []
+    for box in split_bbox(bbox):
+        precision = covering_precision(box, max_precision=zoom_to_precision(zoom))
+        cells = or_(*[cell_column.between(start, end - 1)
+                      for start, end in cell_ranges(box, precision)])
+        min_lng, min_lat, max_lng, max_lat = box
+        clauses.append(and_(cells,
+                            lat_column.between(min_lat, max_lat),
+                            lng_column.between(min_lng, max_lng)))
+    return or_(*clauses)
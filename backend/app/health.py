@@ -0,0 +1,101 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from flask import current_app
+from app import db
+
+# Un seul thread et une seule vérification à la fois : tant que la
+# précédente n'a pas abouti, les sondes échouent sans rien soumettre
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='health')
+_in_flight = None
+_in_flight_lock = threading.Lock()
+
+
+def _select_one(engine, timeout):
+    with engine.begin() as connection:
+        if connection.dialect.name == 'postgresql':
+            connection.execute(db.text(f'SET LOCAL statement_timeout = {int(timeout * 1000)}'))
+        connection.execute(db.text('SELECT 1'))
+
+
+def check_database(timeout):
+    """Exécuter SELECT 1 en au plus ``timeout`` secondes (attente du pool comprise)"""
+    global _in_flight
+    start = time.perf_counter()
+    with _in_flight_lock:
+        if _in_flight is not None and not _in_flight.done():
+            return {'status': 'down', 'error': 'vérification précédente toujours sans réponse'}
+        _in_flight = future = _executor.submit(_select_one, db.engine, timeout)
+    try:
+        future.result(timeout=timeout)
+    except TimeoutError:
+        future.cancel()
+        return {'status': 'down', 'error': f'pas de réponse en {timeout} s'}
+    except Exception as e:
+        return {'status': 'down', 'error': str(e)}
+    return {'status': 'ok', 'latency_ms': round((time.perf_counter() - start) * 1000, 2)}
+
+
+def pool_stats():
+    """Connexions du pool SQLAlchemy de ce processus"""
+    pool = db.engine.pool
+    if not hasattr(pool, 'checkedout'):
+        return {'class': type(pool).__name__}
+    return {
+        'class': type(pool).__name__,
+        'size': pool.size(),
+        'checked_in': pool.checkedin(),
+        'checked_out': pool.checkedout(),
+        'overflow': pool.overflow(),
+        'max_overflow': current_app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}).get('max_overflow')
+    }
+
+
+def _pool_exhausted(stats):
+    if 'checked_out' not in stats or stats['max_overflow'] is None or stats['max_overflow'] < 0:
+        return False
+    return stats['checked_out'] >= stats['size'] + stats['max_overflow']
+
+
+def health_report():
+    """État du processus : base, pool, file d'imports, cache et flux d'événements
+
+    ``status`` vaut ``down`` si la base est injoignable, ``degraded`` si elle
+    est lente, si le pool est saturé ou si la file d'imports déborde.
+    """
+    config = current_app.config
+    database = check_database(config['HEALTH_DB_TIMEOUT'])
+    pool = pool_stats()
+    report = {'database': database, 'pool': pool}
+    problems = []
+
+    jobs = current_app.extensions.get('import_jobs')
+    if jobs is not None:
+        report['import_queue_depth'] = jobs.depth()
+        if report['import_queue_depth'] > config['HEALTH_MAX_QUEUE_DEPTH']:
+            problems.append('file d\'imports saturée')
+
+    cache = current_app.extensions.get('response_cache')
+    if cache is not None:
+        ratio = cache.hit_ratio()
+        report['cache'] = {
+            'hits': cache.hits,
+            'misses': cache.misses,
+            'hit_ratio': round(ratio, 3) if ratio is not None else None
+        }
+
+    broker = current_app.extensions.get('event_broker')
+    if broker is not None:
+        report['stream_subscribers'] = broker.subscriber_count()
+
+    if database['status'] != 'ok':
+        status = 'down'
+    else:
+        if database['latency_ms'] > config['HEALTH_DB_SLOW_MS']:
+            problems.append('base de données lente')
+        if _pool_exhausted(pool):
+            problems.append('pool de connexions saturé')
+        status = 'degraded' if problems else 'ok'
+
+    report['problems'] = problems
+    return {'status': status, **report}
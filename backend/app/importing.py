@@ -0,0 +1,276 @@
+import pandas as pd
+from flask import current_app
+from openpyxl import load_workbook
+from app import db
+from app.cache import invalidate
+from app.models import ConservationPlan, Species
+from app.sqlutils import chunked, insert_many, insert_new
+from app.sync import record_changes
+
+# Taille des lots pour les requêtes IN (limite de paramètres des SGBD)
+LOOKUP_CHUNK_SIZE = 1000
+
+SPECIES_COLUMN_MAPPING = {
+    'nom commun': 'common_name',
+    'nom_commun': 'common_name',
+    'nom scientifique': 'scientific_name',
+    'nom_scientifique': 'scientific_name',
+    'description': 'description'
+}
+SPECIES_REQUIRED_COLUMNS = ['common_name', 'scientific_name']
+
+CONSERVATION_COLUMN_MAPPING = {
+    'Espèce': 'espece',
+    'Nom scientifique': 'nom_scientifique',
+    'Activité': 'activite',
+    'Sous-activité': 'sous_activite',
+    'Tâches': 'taches',
+    'Responsable': 'responsable',
+    'date debut taches': 'date_debut_taches',
+    'date fin taches': 'date_fin_taches',
+    'Budget Année 1': 'budget_annee_1',
+    'Budget Année 2': 'budget_annee_2',
+    'Budget Année 3': 'budget_annee_3',
+    'Budget Année 4': 'budget_annee_4',
+    'Budget Année 5': 'budget_annee_5'
+}
+CONSERVATION_REQUIRED_COLUMNS = ['espece', 'nom_scientifique', 'activite', 'taches',
+                                 'responsable', 'date_debut_taches', 'date_fin_taches']
+
+
+def clean_text(series):
+    """Nettoyer une colonne texte : valeurs manquantes et 'nan' deviennent ''"""
+    cleaned = series.where(series.notna(), '').astype(str).str.strip()
+    return cleaned.mask(cleaned == 'nan', '')
+
+
+def normalize_species_columns(df):
+    """Normaliser et mapper les colonnes d'un fichier d'espèces
+
+    Lève ValueError si des colonnes requises manquent.
+    """
+    df.columns = df.columns.astype(str).str.strip().str.lower()
+    df = df.rename(columns=SPECIES_COLUMN_MAPPING)
+    missing_columns = [col for col in SPECIES_REQUIRED_COLUMNS if col not in df.columns]
+    if missing_columns:
+        raise ValueError(
+            f'Colonnes manquantes: {", ".join(missing_columns)}. '
+            f'Colonnes disponibles: {", ".join(df.columns)}. '
+            'Colonnes requises: common_name, scientific_name'
+        )
+    return df
+
+
+def check_filename(filename):
+    """Lève ValueError si l'extension du fichier n'est pas supportée"""
+    if not filename.lower().endswith(('.xlsx', '.xls', '.csv')):
+        raise ValueError('Format de fichier non supporté. Utilisez .xlsx, .xls ou .csv')
+
+
+def _iter_xlsx_chunks(source, chunk_size):
+    """Parcourir une feuille .xlsx en mode read_only, par lots de lignes
+
+    L'index des DataFrames produits correspond au numéro de ligne de la
+    feuille moins 2 (en-tête en ligne 1), les lignes vides sont ignorées.
+    """
+    workbook = load_workbook(source, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [str(h) if h is not None else f'Unnamed: {i}' for i, h in enumerate(header)]
+
+        records, index = [], []
+        for position, row in enumerate(rows):
+            if all(value is None for value in row):
+                continue
+            records.append(row[:len(columns)])
+            index.append(position)
+            if len(records) >= chunk_size:
+                yield pd.DataFrame.from_records(records, columns=columns, index=index)
+                records, index = [], []
+        if records:
+            yield pd.DataFrame.from_records(records, columns=columns, index=index)
+    finally:
+        workbook.close()
+
+
+def iter_table_chunks(source, filename, chunk_size):
+    """Lire un fichier .xlsx/.xls/.csv (chemin ou flux) par lots de DataFrames
+
+    Seul un lot est en mémoire à la fois (sauf .xls, lu d'un bloc).
+    Lève ValueError si le format n'est pas supporté ou illisible.
+    """
+    check_filename(filename)
+    filename = filename.lower()
+    try:
+        if filename.endswith('.csv'):
+            yield from pd.read_csv(source, chunksize=chunk_size)
+        elif filename.endswith('.xlsx'):
+            yield from _iter_xlsx_chunks(source, chunk_size)
+        else:
+            df = pd.read_excel(source)
+            for start in range(0, len(df), chunk_size):
+                yield df.iloc[start:start + chunk_size]
+    except Exception:
+        raise ValueError('Erreur lors de la lecture du fichier. Vérifiez le format.')
+
+
+def normalize_conservation_columns(df):
+    """Normaliser et mapper les colonnes d'un fichier de plans de conservation
+
+    Lève ValueError si des colonnes requises manquent.
+    """
+    df.columns = df.columns.astype(str).str.strip()
+    df = df.rename(columns=CONSERVATION_COLUMN_MAPPING)
+    missing_columns = [col for col in CONSERVATION_REQUIRED_COLUMNS if col not in df.columns]
+    if missing_columns:
+        raise ValueError(f'Colonnes manquantes: {", ".join(missing_columns)}')
+    return df
+
+
+def existing_scientific_names(names):
+    """Noms scientifiques déjà présents en base, en quelques requêtes IN"""
+    found = set()
+    for chunk in chunked(list(names), LOOKUP_CHUNK_SIZE):
+        rows = db.session.query(Species.scientific_name).filter(
+            Species.scientific_name.in_(chunk)
+        ).all()
+        found.update(name for (name,) in rows)
+    return found
+
+
+def import_species_frame(df, user_id):
+    """Importer un DataFrame d'espèces déjà normalisé
+
+    Le nettoyage et la détection des doublons (dans le fichier et en base)
+    sont faits par colonnes ; les espèces retenues sont insérées par
+    lots. Ne valide pas la transaction. Retourne un dict ``created``
+    (noms communs créés) / ``skipped`` (motifs, dans l'ordre du fichier).
+    """
+    common = clean_text(df['common_name'])
+    scientific = clean_text(df['scientific_name'])
+    if 'description' in df.columns:
+        description = clean_text(df['description'])
+    else:
+        description = pd.Series('', index=df.index)
+
+    missing = (common == '') | (scientific == '')
+    # Un nom scientifique répété dans le fichier est traité comme existant
+    duplicated = scientific[~missing].duplicated(keep='first').reindex(df.index, fill_value=False)
+    candidates = scientific[~missing & ~duplicated]
+    existing = existing_scientific_names(candidates.unique())
+    exists = duplicated | (scientific.isin(existing) & ~missing)
+    valid = ~missing & ~exists
+
+    mappings = pd.DataFrame({
+        'common_name': common[valid],
+        'scientific_name': scientific[valid],
+        'description': description[valid],
+        'created_by': user_id
+    }).to_dict('records')
+    if mappings:
+        inserted = insert_new(Species, mappings, 'scientific_name')
+        record_changes('species', inserted.values())
+        # Espèce créée par un import concurrent depuis la lecture des noms existants
+        exists |= valid & ~scientific.isin(list(inserted))
+        valid &= ~exists
+
+    lines = pd.Series(df.index + 2, index=df.index).astype(str)
+    messages = ('Ligne ' + lines + ': nom commun ou scientifique manquant').where(
+        missing, scientific + ' (existe déjà)'
+    )
+
+    return {
+        'created': common[valid].tolist(),
+        'skipped': messages[~valid].tolist()
+    }
+
+
+PLAN_TEXT_COLUMNS = ['espece', 'nom_scientifique', 'activite', 'sous_activite', 'taches', 'responsable']
+PLAN_BUDGET_COLUMNS = [f'budget_annee_{year}' for year in range(1, 6)]
+
+
+def _plan_dates(series):
+    """Convertir une colonne de dates (texte AAAA-MM-JJ ou dates Excel) ; NaT si invalide"""
+    return pd.to_datetime(series, format='%Y-%m-%d', errors='coerce')
+
+
+def import_conservation_frame(df, user_id):
+    """Importer un DataFrame de plans de conservation déjà normalisé
+
+    Textes, dates et budgets sont convertis colonne par colonne ; les masques
+    de lignes invalides produisent le rapport et les plans valides sont
+    insérés par lots. Ne valide pas la transaction. Retourne un dict
+    ``created`` (espèces des plans créés) / ``skipped`` (motifs, dans l'ordre
+    du fichier).
+    """
+    columns = {}
+    for column in PLAN_TEXT_COLUMNS:
+        columns[column] = clean_text(df[column]) if column in df.columns else pd.Series('', index=df.index)
+    for column in PLAN_BUDGET_COLUMNS:
+        if column in df.columns:
+            columns[column] = pd.to_numeric(df[column], errors='coerce').fillna(0).astype(float)
+        else:
+            columns[column] = pd.Series(0.0, index=df.index)
+    debut = _plan_dates(df['date_debut_taches'])
+    fin = _plan_dates(df['date_fin_taches'])
+
+    missing_names = (columns['espece'] == '') | (columns['nom_scientifique'] == '')
+    invalid_dates = ~missing_names & (debut.isna() | fin.isna())
+    valid = ~missing_names & ~invalid_dates
+
+    lines = 'Ligne ' + pd.Series(df.index + 2, index=df.index).astype(str)
+    messages = (lines + ': espèce ou nom scientifique manquant').where(
+        missing_names, lines + ': dates invalides'
+    )
+    skipped = messages[~valid].tolist()
+
+    plans = pd.DataFrame(columns)[valid]
+    plans['date_debut_taches'] = debut[valid].dt.date
+    plans['date_fin_taches'] = fin[valid].dt.date
+    plans['created_by'] = user_id
+    mappings = plans.to_dict('records')
+    if mappings:
+        record_changes('conservation_plans', insert_many(ConservationPlan, mappings))
+
+    return {
+        'created': plans['espece'].tolist(),
+        'skipped': skipped
+    }
+
+
+# Normalisation, import et espace de cache invalidé pour chaque type de fichier
+IMPORTERS = {
+    'species': (normalize_species_columns, import_species_frame, 'species'),
+    'conservation': (normalize_conservation_columns, import_conservation_frame, 'conservation'),
+}
+
+
+def run_import(kind, source, filename, user_id, progress=None):
+    """Lire, normaliser et importer un fichier par lots de IMPORT_CHUNK_SIZE lignes
+
+    Chaque lot est lu, inséré puis validé avant de lire le suivant : la
+    mémoire utilisée dépend de la taille des lots et non du fichier.
+    ``progress(processed, skipped)`` est appelé après chaque lot. Lève
+    ValueError pour les erreurs de fichier (format, contenu vide, colonnes
+    manquantes).
+    """
+    normalize, import_frame, namespace = IMPORTERS[kind]
+    chunk_size = current_app.config['IMPORT_CHUNK_SIZE']
+    result = {'created': [], 'skipped': []}
+    rows = 0
+    for chunk in iter_table_chunks(source, filename, chunk_size):
+        chunk = normalize(chunk)
+        chunk_result = import_frame(chunk, user_id)
+        db.session.commit()
+        invalidate(namespace)
+        rows += len(chunk)
+        result['created'].extend(chunk_result['created'])
+        result['skipped'].extend(chunk_result['skipped'])
+        if progress:
+            progress(len(chunk), len(chunk_result['skipped']))
+    if rows == 0:
+        raise ValueError('Le fichier est vide')
+    return result
@@ -0,0 +1,135 @@
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from app import db
+from app import geo
+from app.models import Observation, Species
+from app.rollups import record_observations
+from app.sqlutils import chunked, insert_new
+from app.sync import record_changes
+
+INSERT_CHUNK_SIZE = 1000
+UUID_PATTERN = r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}'
+
+
+def _column(frame, name, default=np.nan):
+    if name in frame.columns:
+        return frame[name]
+    return pd.Series(default, index=frame.index, dtype=object)
+
+
+def _numeric(frame, name):
+    """Colonne numérique ; NaN pour les valeurs invalides, y compris true/false
+    du JSON que pd.to_numeric convertirait en 1/0"""
+    column = _column(frame, name)
+    is_bool = column.map(lambda value: isinstance(value, (bool, np.bool_)))
+    return pd.to_numeric(column.where(~is_bool), errors='coerce')
+
+
+def _existing_ids(column, values, key_column):
+    """Correspondance valeur -> id pour les valeurs déjà en base (requêtes IN par lots)"""
+    found = {}
+    values = values.tolist() if hasattr(values, 'tolist') else list(values)
+    for chunk in chunked(values, INSERT_CHUNK_SIZE):
+        rows = db.session.query(column, key_column).filter(column.in_(chunk)).all()
+        found.update(rows)
+    return found
+
+
+def ingest_observations(items):
+    """Valider et insérer un lot d'observations envoyé par un appareil
+
+    Chaque élément porte un ``uuid`` généré par l'appareil : un élément déjà
+    reçu (dans ce lot, un envoi précédent ou un envoi concurrent) est signalé
+    ``duplicate`` avec l'id existant au lieu d'être réinséré, ce qui rend les
+    nouvelles tentatives sûres. La validation se fait par colonnes et les
+    insertions par lots. Ne valide pas la transaction.
+    """
+    frame = pd.DataFrame.from_records([item if isinstance(item, dict) else {} for item in items])
+    frame.index = pd.RangeIndex(len(items))
+    not_object = pd.Series([not isinstance(item, dict) for item in items], index=frame.index)
+
+    uuid = _column(frame, 'uuid').where(lambda s: s.notna(), '').astype(str).str.strip().str.lower()
+    species_id = _numeric(frame, 'species_id')
+    latitude = _numeric(frame, 'latitude')
+    longitude = _numeric(frame, 'longitude')
+    raw_observed_at = _column(frame, 'observed_at')
+    # Chaînes ISO 8601 seulement : un nombre serait lu comme des nanosecondes depuis 1970
+    observed_at_is_text = raw_observed_at.map(lambda value: isinstance(value, str))
+    observed_at = pd.to_datetime(
+        raw_observed_at.where(observed_at_is_text), errors='coerce', utc=True, format='ISO8601'
+    ).dt.tz_localize(None)
+    observed_at = observed_at.where(raw_observed_at.notna(), pd.Timestamp(datetime.utcnow()))
+    notes = _column(frame, 'notes', '').where(lambda s: s.notna(), '').astype(str)
+
+    # Contrôles vectorisés, par ordre de priorité du message renvoyé
+    checks = [
+        (not_object, 'Objet JSON attendu'),
+        (~uuid.str.fullmatch(UUID_PATTERN), 'uuid manquant ou invalide'),
+        (species_id.isna() | (species_id % 1 != 0), 'species_id invalide'),
+        (latitude.isna() | longitude.isna(), 'Valeurs numériques invalides'),
+        (~latitude.between(-90, 90), 'Latitude invalide (doit être entre -90 et 90)'),
+        (~longitude.between(-180, 180), 'Longitude invalide (doit être entre -180 et 180)'),
+        (observed_at.isna(), 'Format de date invalide'),
+    ]
+    masks = np.array([mask.to_numpy(dtype=bool) for mask, _ in checks])
+    invalid = masks.any(axis=0)
+    messages = np.select(masks, [msg for _, msg in checks], default='')
+
+    # Espèces inconnues
+    candidate_species = species_id[~invalid].astype(int).unique()
+    known_species = _existing_ids(Species.id, candidate_species, Species.id)
+    unknown = ~invalid & ~species_id.isin(list(known_species)).to_numpy()
+    messages[unknown] = 'Espèce inconnue'
+    invalid |= unknown
+
+    # Doublons : dans le lot (même uuid plus haut) ou déjà reçus
+    valid = pd.Series(~invalid, index=frame.index)
+    repeated = (uuid[valid].duplicated(keep='first')).reindex(frame.index, fill_value=False).to_numpy()
+    existing = _existing_ids(Observation.client_uuid, uuid[valid].unique(), Observation.id)
+    already_stored = valid.to_numpy() & uuid.isin(list(existing)).to_numpy()
+    to_insert = valid.to_numpy() & ~repeated & ~already_stored
+
+    # Insertion par lots ; ON CONFLICT couvre les envois concurrents du même uuid
+    inserted = {}
+    if to_insert.any():
+        cells = geo.encode_many(latitude[to_insert].to_numpy(), longitude[to_insert].to_numpy())
+        columns = {
+            'client_uuid': uuid[to_insert].tolist(),
+            'species_id': species_id[to_insert].astype(int).tolist(),
+            'latitude': latitude[to_insert].tolist(),
+            'longitude': longitude[to_insert].tolist(),
+            'geocell': cells.tolist(),
+            'observed_at': observed_at[to_insert].dt.to_pydatetime().tolist(),
+            'notes': notes[to_insert].tolist()
+        }
+        records = [dict(zip(columns, values)) for values in zip(*columns.values())]
+        inserted = insert_new(Observation, records, 'client_uuid', INSERT_CHUNK_SIZE)
+
+        record_observations(
+            (record['species_id'], record['observed_at'])
+            for record in records if record['client_uuid'] in inserted
+        )
+        record_changes('observations', inserted.values())
+        lost = [record['client_uuid'] for record in records if record['client_uuid'] not in inserted]
+        existing.update(_existing_ids(Observation.client_uuid, lost, Observation.id))
+
+    results = []
+    counts = {'created': 0, 'duplicate': 0, 'invalid': 0}
+    for index, key in enumerate(uuid.tolist()):
+        if invalid[index]:
+            item = {'index': index, 'status': 'invalid', 'msg': messages[index]}
+        elif key in inserted and to_insert[index]:
+            item = {'index': index, 'status': 'created', 'id': inserted[key]}
+        else:
+            item = {'index': index, 'status': 'duplicate', 'id': inserted.get(key) or existing.get(key)}
+        item['uuid'] = key or None
+        counts[item['status']] += 1
+        results.append(item)
+
+    return {
+        'created': counts['created'],
+        'duplicates': counts['duplicate'],
+        'invalid': counts['invalid'],
+        'results': results
+    }
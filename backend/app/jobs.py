@@ -0,0 +1,183 @@
+import logging
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from sqlalchemy import delete, insert, update
+from app import db
+from app.importing import check_filename, run_import
+from app.logs import request_id
+from app.models import ImportJob
+
+log = logging.getLogger(__name__)
+
+
+class LocalBroker:
+    """Broker en mémoire : exécute les tâches dans un pool de threads local
+
+    Remplaçable par un broker partagé exposant la même interface
+    (``submit``, ``depth``, ``shutdown``).
+    """
+
+    def __init__(self, max_workers):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='import')
+        self._idle = threading.Condition()
+        self._pending = 0
+
+    def submit(self, fn, *args):
+        with self._idle:
+            self._pending += 1
+        future = self._executor.submit(fn, *args)
+        # Appelé aussi pour une tâche annulée avant d'avoir démarré
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, future):
+        with self._idle:
+            self._pending -= 1
+            self._idle.notify_all()
+
+    def depth(self):
+        """Nombre de tâches en attente ou en cours"""
+        with self._idle:
+            return self._pending
+
+    def shutdown(self, timeout=0):
+        """Annuler les tâches en attente et laisser ``timeout`` secondes aux tâches en cours
+
+        Retourne True si toutes les tâches sont terminées.
+        """
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        with self._idle:
+            return self._idle.wait_for(lambda: self._pending == 0, timeout)
+
+
+class ImportJobQueue:
+    """File d'imports asynchrones : fichiers stockés sur disque, traités par le broker
+
+    L'état des imports est enregistré dans la table ``import_jobs`` : il est
+    lisible depuis n'importe quel worker et survit aux redémarrages. Les
+    écritures passent par des connexions courtes, indépendantes de la
+    transaction de l'import.
+    """
+
+    def __init__(self, app, broker=None):
+        self.app = app
+        self.spool_dir = app.config['IMPORT_SPOOL_DIR']
+        self.ttl = app.config['IMPORT_JOB_TTL']
+        self.stale_after = app.config['IMPORT_JOB_STALE_AFTER']
+        self.broker = broker or LocalBroker(app.config['IMPORT_WORKERS'])
+        # Imports planifiés par ce processus et pas encore terminés
+        self._active = set()
+        self._active_lock = threading.Lock()
+        os.makedirs(self.spool_dir, exist_ok=True)
+
+    def submit(self, kind, upload, user_id):
+        """Écrire le fichier reçu sur disque et planifier son import ; retourne l'id de l'import
+
+        Lève ValueError si le format du fichier n'est pas supporté.
+        """
+        check_filename(upload.filename)
+        job_id = uuid.uuid4().hex
+        extension = os.path.splitext(upload.filename)[1].lower()
+        path = os.path.join(self.spool_dir, f'{job_id}{extension}')
+        upload.save(path)
+
+        now = datetime.utcnow()
+        with db.engine.begin() as connection:
+            connection.execute(delete(ImportJob).where(
+                ImportJob.finished_at < now - timedelta(seconds=self.ttl)
+            ))
+            connection.execute(insert(ImportJob).values(
+                id=job_id, kind=kind, filename=upload.filename, user_id=user_id, status='queued',
+                rows_processed=0, rows_skipped=0, created=0,
+                # Les logs de l'import portent l'identifiant de la requête qui l'a planifié
+                request_id=request_id.get() or job_id,
+                submitted_at=now, updated_at=now
+            ))
+        with self._active_lock:
+            self._active.add(job_id)
+        self.broker.submit(self._process, job_id, path)
+        return job_id
+
+    def get(self, job_id):
+        """État d'un import, ou None ; un import sans progression depuis trop longtemps est marqué en échec"""
+        job = db.session.get(ImportJob, job_id)
+        if job is None or job.status not in ('queued', 'running'):
+            return job
+        if job.updated_at < datetime.utcnow() - timedelta(seconds=self.stale_after):
+            self._update(job_id, status='failed', finished_at=datetime.utcnow(),
+                         error='Import interrompu (arrêt du serveur)')
+            db.session.refresh(job)
+        return job
+
+    def depth(self):
+        return self.broker.depth()
+
+    def shutdown(self, timeout):
+        """Arrêt du worker : attendre les imports en cours au plus ``timeout`` secondes
+
+        Les imports annulés ou inachevés sont marqués en échec tout de suite,
+        sans attendre IMPORT_JOB_STALE_AFTER ; les lots déjà validés restent
+        en base.
+        """
+        self.broker.shutdown(timeout)
+        with self._active_lock:
+            interrupted = list(self._active)
+        with self.app.app_context():
+            for job_id in interrupted:
+                self._update(job_id, status='failed', finished_at=datetime.utcnow(),
+                             error='Import interrompu (arrêt du worker), lots déjà importés conservés')
+        return interrupted
+
+    def _update(self, job_id, **values):
+        with db.engine.begin() as connection:
+            connection.execute(update(ImportJob).where(ImportJob.id == job_id).values(
+                updated_at=datetime.utcnow(), **values
+            ))
+
+    def _process(self, job_id, path):
+        with self.app.app_context():
+            job = db.session.get(ImportJob, job_id)
+            kind, filename, user_id = job.kind, job.filename, job.user_id
+            token = request_id.set(job.request_id)
+            db.session.remove()
+
+            def progress(processed, skipped):
+                self._update(job_id, rows_processed=ImportJob.rows_processed + processed,
+                             rows_skipped=ImportJob.rows_skipped + skipped)
+
+            self._update(job_id, status='running', started_at=datetime.utcnow())
+            try:
+                result = run_import(kind, path, filename, user_id, progress=progress)
+                self._update(job_id, status='done', finished_at=datetime.utcnow(),
+                             created=len(result['created']), skipped_details=result['skipped'][:10])
+                log.info("Import job done", extra={'job_id': job_id, 'kind': kind})
+            except ValueError as e:
+                db.session.rollback()
+                self._update(job_id, status='failed', finished_at=datetime.utcnow(), error=str(e))
+            except Exception as e:
+                log.exception("Error in import job %s", job_id)
+                db.session.rollback()
+                self._update(job_id, status='failed', finished_at=datetime.utcnow(),
+                             error=f'Erreur lors de l\'import: {str(e)}')
+            finally:
+                with self._active_lock:
+                    self._active.discard(job_id)
+                db.session.remove()
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                request_id.reset(token)
+
+
+def wants_async(args):
+    """Le client demande-t-il un import en arrière-plan (?async=1) ?"""
+    return args.get('async', '').lower() in ('1', 'true', 'yes')
+
+
+def init_jobs(app, broker=None):
+    """Attacher la file d'imports à l'application"""
+    app.extensions['import_jobs'] = ImportJobQueue(app, broker)
@@ -0,0 +1,158 @@
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import re
+import sys
+import uuid
+from datetime import datetime, timezone
+from flask import g, request
+
+REQUEST_ID_HEADER = 'X-Request-ID'
+REQUEST_ID_PATTERN = re.compile(r'[A-Za-z0-9._-]{1,64}')
+
+# Identifiant de corrélation du traitement en cours (requête HTTP ou import en arrière-plan)
+request_id = contextvars.ContextVar('request_id', default=None)
+
+# Attributs standard d'un LogRecord, exclus des champs structurés
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {'message', 'request_id'}
+
+
+class ContextFilter(logging.Filter):
+    """Ajouter l'identifiant de corrélation et échantillonner les messages DEBUG
+
+    Exécuté dans le thread appelant, avant la mise en file : un message
+    écarté par l'échantillonnage ne coûte qu'un tirage aléatoire.
+    """
+
+    def __init__(self, debug_sample_rate=1.0):
+        super().__init__()
+        self.debug_sample_rate = debug_sample_rate
+
+    def filter(self, record):
+        if record.levelno <= logging.DEBUG and random.random() >= self.debug_sample_rate:
+            return False
+        record.request_id = request_id.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Une ligne JSON par message ; les champs passés via ``extra`` sont conservés"""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage()
+        }
+        if getattr(record, 'request_id', None):
+            entry['request_id'] = record.request_id
+        entry.update({k: v for k, v in vars(record).items() if k not in _RECORD_ATTRIBUTES})
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__('%(asctime)s %(levelname)s [%(request_id)s] %(name)s: %(message)s')
+
+    def format(self, record):
+        record.request_id = getattr(record, 'request_id', None) or '-'
+        return super().format(record)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Mise en file non bloquante : si la file est pleine, le message est abandonné"""
+
+    dropped = 0
+
+    def prepare(self, record):
+        # Seul le message est résolu ici ; le formatage se fait dans le thread d'écriture
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            DroppingQueueHandler.dropped += 1
+
+
+_listener = None
+_handler = None
+_output = None
+
+
+def _start_listener():
+    global _listener
+    _handler.queue = queue.Queue(_handler.queue.maxsize)
+    _listener = logging.handlers.QueueListener(_handler.queue, _output, respect_handler_level=False)
+    _listener.start()
+
+
+def _stop_listener():
+    if _listener is not None:
+        _listener.stop()
+
+
+def _restart_after_fork():
+    # Le thread d'écriture ne survit pas au fork des workers gunicorn
+    if _handler is not None:
+        _start_listener()
+
+
+os.register_at_fork(after_in_child=_restart_after_fork)
+atexit.register(_stop_listener)
+
+
+def _incoming_request_id():
+    value = request.headers.get(REQUEST_ID_HEADER, '')
+    # Identifiant fourni par le proxy, accepté seulement s'il est court et sans caractère spécial
+    return value if REQUEST_ID_PATTERN.fullmatch(value) else uuid.uuid4().hex
+
+
+def init_logging(app):
+    """Configurer la journalisation : file non bloquante, JSON ou texte, corrélation des requêtes"""
+    global _handler, _output
+    _output = logging.StreamHandler(sys.stdout)
+    _output.setFormatter(JsonFormatter() if app.config['LOG_FORMAT'] == 'json' else TextFormatter())
+
+    root = logging.getLogger()
+    if _handler is not None:
+        root.removeHandler(_handler)
+        _stop_listener()
+    _handler = DroppingQueueHandler(queue.Queue(app.config['LOG_QUEUE_SIZE']))
+    _handler.addFilter(ContextFilter(app.config['LOG_DEBUG_SAMPLE_RATE']))
+    root.addHandler(_handler)
+    root.setLevel(app.config['LOG_LEVEL'].upper())
+    _start_listener()
+
+    @app.before_request
+    def _bind_request_id():
+        g.request_id = _incoming_request_id()
+        g.request_id_token = request_id.set(g.request_id)
+
+    @app.after_request
+    def _send_request_id(response):
+        if 'request_id' in g:
+            response.headers[REQUEST_ID_HEADER] = g.request_id
+        return response
+
+    @app.teardown_request
+    def _unbind_request_id(exc):
+        token = g.pop('request_id_token', None)
+        if token is not None:
+            request_id.reset(token)
@@ -1,19 +1,46 @@
+import logging
 from flask import Flask, jsonify, request
 from flask_cors import CORS
+from werkzeug.exceptions import HTTPException
 from app import db, jwt
 from app.config import Config
-import time
-import sys
+from app.cache import init_cache
+from app.compression import init_compression
+from app.events import init_events
+from app.jobs import init_jobs
+from app.logs import REQUEST_ID_HEADER, init_logging
+from app.metrics import init_metrics
+from app.migrations import check_query_plans_command, init_db_command, migrate_command
+from app.pagination import NEXT_CURSOR_HEADER
+from app.passwords import init_passwords
+from app.profiling import init_profiling
+from app.rollups import rebuild_stats_command
+from app.serialization import init_json
+
+log = logging.getLogger(__name__)
 
 def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
+    init_compression(app)
+    init_logging(app)
+    init_json(app)
     
     # Activer CORS pour toutes les routes
-    CORS(app)
+    CORS(app, expose_headers=[NEXT_CURSOR_HEADER, REQUEST_ID_HEADER, 'X-Query-Count', 'Server-Timing'])
     
     db.init_app(app)
     jwt.init_app(app)
+    init_jobs(app)
+    init_passwords(app)
+    init_cache(app)
+    init_events(app)
+    init_metrics(app)
+    init_profiling(app)
+    app.cli.add_command(rebuild_stats_command)
+    app.cli.add_command(init_db_command)
+    app.cli.add_command(migrate_command)
+    app.cli.add_command(check_query_plans_command)
     
     # Route de santé
     @app.route('/')
@@ -31,104 +58,91 @@ def create_app():
             ]
         })
     
-    @app.route('/health')
-    def health():
-        return jsonify({
-            "status": "healthy",
-            "database": "connected",
-            "conservation_system": "active"
-        })
-    
     # Middleware pour capturer et logger les erreurs
     @app.errorhandler(422)
     def handle_422(e):
-        print(f"Error 422: {e}")
-        print(f"Request: {request.method} {request.path}")
-        print(f"Headers: {dict(request.headers)}")
-        print(f"Data: {request.get_data()}")
+        # Ni en-têtes ni corps dans les logs : ils contiennent jetons et données personnelles
+        log.warning("Error 422 on %s %s: %s", request.method, request.path, e)
         return jsonify({'error': 'Unprocessable Entity', 'details': str(e)}), 422
     
     @app.errorhandler(Exception)
     def handle_exception(e):
-        print(f"Unhandled exception: {e}")
-        print(f"Request: {request.method} {request.path}")
+        # Erreurs HTTP attendues (404, 405...) : pas de trace d'appel dans les logs
+        if isinstance(e, HTTPException):
+            return jsonify({'error': e.name, 'details': e.description}), e.code
+        log.exception("Unhandled exception on %s %s", request.method, request.path)
         return jsonify({'error': 'Internal server error', 'details': str(e)}), 500
     
     # Enregistrer les blueprints avec gestion d'erreurs
+    try:
+        from app.routes.health_route import health_bp
+        app.register_blueprint(health_bp)
+        log.info("Health blueprint registered")
+    except Exception:
+        log.exception("Error registering health blueprint")
+    
     try:
         from app.routes.auth import auth_bp
         app.register_blueprint(auth_bp, url_prefix='/api/auth')
-        print("✅ Auth blueprint registered")
-    except Exception as e:
-        print(f"❌ Error registering auth blueprint: {e}")
+        log.info("Auth blueprint registered")
+    except Exception:
+        log.exception("Error registering auth blueprint")
     
     try:
         from app.routes.species import species_bp
         app.register_blueprint(species_bp, url_prefix='/api/species')
-        print("✅ Species blueprint registered")
-    except Exception as e:
-        print(f"❌ Error registering species blueprint: {e}")
+        log.info("Species blueprint registered")
+    except Exception:
+        log.exception("Error registering species blueprint")
     
     try:
         from app.routes.observations import obs_bp
         app.register_blueprint(obs_bp, url_prefix='/api/observations')
-        print("✅ Observations blueprint registered")
-    except Exception as e:
-        print(f"❌ Error registering observations blueprint: {e}")
+        log.info("Observations blueprint registered")
+    except Exception:
+        log.exception("Error registering observations blueprint")
     
     try:
         from app.routes.stats import stats_bp
         app.register_blueprint(stats_bp, url_prefix='/api/stats')
-        print("✅ Stats blueprint registered")
-    except Exception as e:
-        print(f"❌ Error registering stats blueprint: {e}")
+        log.info("Stats blueprint registered")
+    except Exception:
+        log.exception("Error registering stats blueprint")
     
     try:
         from app.routes.importer import importer_bp
         app.register_blueprint(importer_bp, url_prefix='/api/import')
-        print("✅ Importer blueprint registered")
+        log.info("Importer blueprint registered")
     except ImportError as e:
-        print(f"⚠️ Importer blueprint not found: {e}")
-    except Exception as e:
-        print(f"❌ Error registering importer blueprint: {e}")
+        log.warning("Importer blueprint not found: %s", e)
+    except Exception:
+        log.exception("Error registering importer blueprint")
     
     # Nouveau blueprint pour la conservation et planification
     try:
         from app.routes.conservation import conservation_bp
         app.register_blueprint(conservation_bp, url_prefix='/api/conservation')
-        print("✅ Conservation planning blueprint registered")
+        log.info("Conservation planning blueprint registered")
     except ImportError as e:
-        print(f"⚠️ Conservation blueprint not found: {e}")
-    except Exception as e:
-        print(f"❌ Error registering conservation blueprint: {e}")
+        log.warning("Conservation blueprint not found: %s", e)
+    except Exception:
+        log.exception("Error registering conservation blueprint")
     
-    # Retry logic pour la connexion DB
-    max_retries = 30
-    retry_delay = 2
+    try:
+        from app.routes.sync import sync_bp
+        app.register_blueprint(sync_bp, url_prefix='/api/sync')
+        log.info("Sync blueprint registered")
+    except Exception:
+        log.exception("Error registering sync blueprint")
     
-    for attempt in range(max_retries):
-        try:
-            with app.app_context():
-                db.create_all()
-                print("✅ Database tables created successfully!")
-                
-                # Vérifier les tables créées
-                inspector = db.inspect(db.engine)
-                tables = inspector.get_table_names()
-                print(f"📊 Available tables: {', '.join(tables)}")
-                
-            print("Database connection successful!")
-            break
-        except Exception as e:
-            print(f"Database connection attempt {attempt + 1} failed: {e}")
-            if attempt == max_retries - 1:
-                print("Max retries reached. Exiting.")
-                sys.exit(1)
-            time.sleep(retry_delay)
+    try:
+        from app.routes.stream import stream_bp
+        app.register_blueprint(stream_bp, url_prefix='/api/stream')
+        log.info("Stream blueprint registered")
+    except Exception:
+        log.exception("Error registering stream blueprint")
     
     return app
 
-app = create_app()
-
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
+    create_app().run(host='0.0.0.0', port=5000, debug=True)
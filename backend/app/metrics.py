@@ -0,0 +1,74 @@
+import os
+import time
+from flask import Response, g, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, REGISTRY, generate_latest, multiprocess
+)
+from app.querystats import request_query_stats
+
+# Avec plusieurs workers, PROMETHEUS_MULTIPROC_DIR pointe vers un dossier
+# partagé où chaque processus écrit ses compteurs (voir gunicorn.conf.py)
+MULTIPROCESS = bool(os.getenv('PROMETHEUS_MULTIPROC_DIR'))
+
+LABELS = ['blueprint', 'endpoint', 'method']
+
+REQUESTS = Counter(
+    'http_requests_total', 'Requêtes HTTP traitées', LABELS + ['status']
+)
+LATENCY = Histogram(
+    'http_request_duration_seconds', 'Durée de traitement des requêtes HTTP', LABELS,
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+)
+PAYLOAD = Histogram(
+    'http_response_size_bytes', 'Taille des réponses (hors streaming)', LABELS,
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+)
+DB_QUERIES = Histogram(
+    'db_queries_per_request', 'Requêtes SQL émises par requête HTTP', LABELS,
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 500)
+)
+DB_TIME = Histogram(
+    'db_time_per_request_seconds', 'Temps passé en base par requête HTTP', LABELS,
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 10)
+)
+
+
+def _start_timer():
+    g.metrics_start = time.perf_counter()
+
+
+def _record(response):
+    start = g.get('metrics_start')
+    if start is None or request.endpoint == 'metrics':
+        return response
+    labels = {
+        'blueprint': request.blueprint or '',
+        # Les URL inconnues sont regroupées pour borner le nombre de séries
+        'endpoint': request.endpoint or 'unmatched',
+        'method': request.method
+    }
+    REQUESTS.labels(status=str(response.status_code), **labels).inc()
+    LATENCY.labels(**labels).observe(time.perf_counter() - start)
+    if not response.is_streamed and response.content_length is not None:
+        PAYLOAD.labels(**labels).observe(response.content_length)
+    query_count, query_time = request_query_stats()
+    DB_QUERIES.labels(**labels).observe(query_count)
+    DB_TIME.labels(**labels).observe(query_time)
+    return response
+
+
+def metrics():
+    """Exposition au format texte Prometheus (agrégée sur tous les workers si besoin)"""
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), mimetype=CONTENT_TYPE_LATEST)
+
+
+def init_metrics(app):
+    """Mesurer chaque requête et exposer /metrics"""
+    app.before_request(_start_timer)
+    app.after_request(_record)
+    app.add_url_rule('/metrics', 'metrics', metrics)
@@ -0,0 +1,122 @@
+from datetime import datetime
+import time
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import Column, DateTime, MetaData, String, Table, text
+from app import db
+from app.migrations import (
+    m0001_initial_schema, m0002_geocell_sync_rollups, m0003_hot_path_indexes, m0004_import_jobs
+)
+from app.migrations.ops import has_table
+from app.migrations.plans import check_query_plans
+
+# Migrations dans l'ordre d'application ; une migration publiée ne se modifie plus
+MIGRATIONS = [
+    m0001_initial_schema,
+    m0002_geocell_sync_rollups,
+    m0003_hot_path_indexes,
+    m0004_import_jobs,
+]
+
+# Verrou consultatif PostgreSQL : une seule migration à la fois, même avec plusieurs instances
+MIGRATION_LOCK_KEY = 7316001
+
+schema_migrations = Table(
+    'schema_migrations', MetaData(),
+    Column('version', String(100), primary_key=True),
+    Column('applied_at', DateTime, nullable=False)
+)
+
+
+def _version(migration):
+    return migration.__name__.rsplit('.', 1)[1].lstrip('m')
+
+
+def applied_versions(connection):
+    schema_migrations.create(connection, checkfirst=True)
+    return set(connection.execute(schema_migrations.select().with_only_columns(
+        schema_migrations.c.version
+    )).scalars())
+
+
+def upgrade():
+    """Appliquer les migrations en attente, chacune dans sa transaction ; retourne leurs versions"""
+    applied = []
+    with db.engine.connect() as connection:
+        postgres = connection.dialect.name == 'postgresql'
+        if postgres:
+            connection.execute(text('SELECT pg_advisory_lock(:key)'), {'key': MIGRATION_LOCK_KEY})
+        connection.commit()
+        try:
+            with connection.begin():
+                done = applied_versions(connection)
+            for migration in MIGRATIONS:
+                version = _version(migration)
+                if version in done:
+                    continue
+                with connection.begin():
+                    migration.upgrade(connection)
+                    connection.execute(schema_migrations.insert().values(
+                        version=version, applied_at=datetime.utcnow()
+                    ))
+                applied.append(version)
+        finally:
+            if postgres:
+                connection.execute(text('SELECT pg_advisory_unlock(:key)'), {'key': MIGRATION_LOCK_KEY})
+                connection.commit()
+    return applied
+
+
+def pending():
+    """Versions pas encore appliquées (lecture seule)"""
+    with db.engine.connect() as connection:
+        if has_table(connection, schema_migrations.name):
+            done = set(connection.execute(schema_migrations.select().with_only_columns(
+                schema_migrations.c.version
+            )).scalars())
+        else:
+            done = set()
+    return [_version(m) for m in MIGRATIONS if _version(m) not in done]
+
+
+@click.command('migrate')
+@with_appcontext
+def migrate_command():
+    """Appliquer les migrations de schéma en attente"""
+    applied = upgrade()
+    for version in applied:
+        click.echo(f'✅ Migration {version} appliquée')
+    if not applied:
+        click.echo('Schéma à jour')
+
+
+@click.command('init-db')
+@click.option('--retries', default=30, help='Tentatives de connexion à la base')
+@click.option('--delay', default=2.0, help='Secondes entre deux tentatives')
+@with_appcontext
+def init_db_command(retries, delay):
+    """Attendre la base de données puis appliquer les migrations (à lancer au déploiement)"""
+    for attempt in range(1, retries + 1):
+        try:
+            with db.engine.connect() as connection:
+                connection.execute(text('SELECT 1'))
+            break
+        except Exception as e:
+            click.echo(f'Database connection attempt {attempt} failed: {e}')
+            if attempt == retries:
+                raise click.ClickException('Base de données injoignable')
+            time.sleep(delay)
+    applied = upgrade()
+    click.echo(f"✅ Base de données prête ({len(applied)} migration(s) appliquée(s))")
+
+
+@click.command('check-query-plans')
+@with_appcontext
+def check_query_plans_command():
+    """Vérifier par EXPLAIN que les requêtes fréquentes utilisent un index"""
+    failures = 0
+    for label, ok, plan in check_query_plans():
+        click.echo(f"{'✅' if ok else '❌'} {label}: {plan}")
+        failures += not ok
+    if failures:
+        raise click.ClickException(f'{failures} requête(s) sans index (parcours séquentiel)')
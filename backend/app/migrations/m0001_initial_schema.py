@@ -0,0 +1,8 @@
+"""Tables d'origine (jusqu'ici créées par db.create_all au démarrage)"""
+from app.migrations.ops import create_table
+from app.models import ConservationPlan, Observation, Species, User
+
+
+def upgrade(connection):
+    for model in (User, Species, ConservationPlan, Observation):
+        create_table(connection, model)
@@ -0,0 +1,45 @@
+"""Cellule spatiale, idempotence des envois groupés, synthèses et journal des écritures"""
+from sqlalchemy import bindparam, text
+from app import geo
+from app.migrations.ops import add_column, create_index, create_table
+from app.models import ChangeLog, Observation, SpeciesMonthlyCount, SpeciesObservationCount
+from app.rollups import populate
+
+BACKFILL_BATCH_SIZE = 5000
+
+
+def _backfill_geocells(connection):
+    """Calculer la cellule des observations existantes, par lots"""
+    update = text('UPDATE observations SET geocell = :cell WHERE id = :oid').bindparams(
+        bindparam('cell'), bindparam('oid')
+    )
+    last_id = 0
+    while True:
+        rows = connection.execute(text(
+            'SELECT id, latitude, longitude FROM observations '
+            'WHERE id > :last_id AND geocell IS NULL '
+            'AND latitude IS NOT NULL AND longitude IS NOT NULL '
+            'ORDER BY id LIMIT :size'
+        ), {'last_id': last_id, 'size': BACKFILL_BATCH_SIZE}).all()
+        if not rows:
+            return
+        ids, lats, lngs = zip(*rows)
+        cells = geo.encode_many(lats, lngs).tolist()
+        connection.execute(update, [{'cell': cell, 'oid': oid} for oid, cell in zip(ids, cells)])
+        last_id = ids[-1]
+
+
+def upgrade(connection):
+    add_column(connection, Observation, 'geocell')
+    create_index(connection, Observation, 'ix_observations_geocell')
+    _backfill_geocells(connection)
+
+    add_column(connection, Observation, 'client_uuid')
+    create_index(connection, Observation, 'ix_observations_client_uuid')
+
+    created = create_table(connection, SpeciesObservationCount)
+    created = create_table(connection, SpeciesMonthlyCount) or created
+    if created:
+        populate(connection, connection.dialect.name)
+
+    create_table(connection, ChangeLog)
@@ -0,0 +1,23 @@
+"""Index des requêtes fréquentes : observations, imports d'espèces et rapports des plans"""
+from sqlalchemy import text
+from app.migrations.ops import create_index
+from app.models import ConservationPlan, Observation, Species
+
+
+def upgrade(connection):
+    duplicates = connection.execute(text(
+        'SELECT scientific_name FROM species WHERE scientific_name IS NOT NULL '
+        'GROUP BY scientific_name HAVING count(*) > 1 ORDER BY scientific_name'
+    )).scalars().all()
+    if duplicates:
+        raise RuntimeError(
+            'Noms scientifiques en double, à fusionner avant de migrer : ' + ', '.join(duplicates)
+        )
+    create_index(connection, Species, 'ix_species_scientific_name')
+
+    create_index(connection, Observation, 'ix_observations_species_observed_at')
+    create_index(connection, Observation, 'ix_observations_observed_at')
+
+    create_index(connection, ConservationPlan, 'ix_conservation_plans_espece')
+    create_index(connection, ConservationPlan, 'ix_conservation_plans_responsable')
+    create_index(connection, ConservationPlan, 'ix_conservation_plans_dates')
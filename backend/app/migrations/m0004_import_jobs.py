@@ -0,0 +1,7 @@
+"""Suivi des imports en arrière-plan en base, partagé entre workers"""
+from app.migrations.ops import create_table
+from app.models import ImportJob
+
+
+def upgrade(connection):
+    create_table(connection, ImportJob)
@@ -0,0 +1,35 @@
+from sqlalchemy import inspect
+
+
+def has_table(connection, name):
+    return inspect(connection).has_table(name)
+
+
+def create_table(connection, model):
+    """Créer la table d'un modèle (et ses index) si elle n'existe pas ; True si créée"""
+    if has_table(connection, model.__tablename__):
+        return False
+    model.__table__.create(connection)
+    return True
+
+
+def add_column(connection, model, name):
+    """Ajouter une colonne déclarée sur le modèle si elle manque ; True si ajoutée"""
+    table = model.__table__
+    existing = {column['name'] for column in inspect(connection).get_columns(table.name)}
+    if name in existing:
+        return False
+    column_type = table.c[name].type.compile(dialect=connection.dialect)
+    connection.exec_driver_sql(f'ALTER TABLE {table.name} ADD COLUMN {name} {column_type}')
+    return True
+
+
+def create_index(connection, model, name):
+    """Créer un index déclaré dans les ``__table_args__`` du modèle s'il manque"""
+    table = model.__table__
+    existing = {index['name'] for index in inspect(connection).get_indexes(table.name)}
+    if name in existing:
+        return False
+    index = next(index for index in table.indexes if index.name == name)
+    index.create(connection)
+    return True
@@ -0,0 +1,62 @@
+import json
+import re
+from sqlalchemy import text
+from app import db
+
+# Requêtes fréquentes : (libellé, table qui ne doit pas être parcourue entièrement, SQL)
+HOT_QUERIES = [
+    ('observations par espèce et période', 'observations',
+     "SELECT id FROM observations WHERE species_id = 1 AND observed_at >= '2024-01-01'"),
+    ('observations par période', 'observations',
+     "SELECT count(*) FROM observations WHERE observed_at >= '2024-01-01' AND observed_at < '2024-02-01'"),
+    ('observations par cellule (bbox)', 'observations',
+     'SELECT id FROM observations WHERE geocell BETWEEN 1024 AND 2047'),
+    ('envoi groupé : uuid déjà reçus', 'observations',
+     "SELECT client_uuid, id FROM observations WHERE client_uuid IN ('a', 'b')"),
+    ('import : noms scientifiques existants', 'species',
+     "SELECT scientific_name FROM species WHERE scientific_name IN ('a', 'b')"),
+    ('plans par espèce', 'conservation_plans',
+     "SELECT id FROM conservation_plans WHERE espece = 'Lion'"),
+    ('plans par responsable', 'conservation_plans',
+     "SELECT id FROM conservation_plans WHERE responsable = 'x'"),
+    ('plans en cours à une date', 'conservation_plans',
+     "SELECT id FROM conservation_plans WHERE date_debut_taches <= '2025-01-01' "
+     "AND date_fin_taches >= '2025-01-01'"),
+    ('synchronisation', 'change_log',
+     'SELECT id, entity, entity_id FROM change_log WHERE id > 0 ORDER BY id LIMIT 100'),
+]
+
+
+def _postgres_plan(connection, sql, table):
+    # Sans parcours séquentiel autorisé, le planificateur ne le choisit que faute d'index
+    connection.execute(text('SET LOCAL enable_seqscan = off'))
+    plan = connection.execute(text(f'EXPLAIN (FORMAT JSON) {sql}')).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    nodes, scans = [plan[0]['Plan']], []
+    while nodes:
+        node = nodes.pop()
+        nodes.extend(node.get('Plans', []))
+        if 'Relation Name' in node:
+            scans.append((node['Node Type'], node['Relation Name']))
+    ok = ('Seq Scan', table) not in scans
+    return ok, ', '.join(f'{kind} on {relation}' for kind, relation in scans)
+
+
+def _sqlite_plan(connection, sql, table):
+    details = [row[-1] for row in connection.execute(text(f'EXPLAIN QUERY PLAN {sql}'))]
+    full_scan = re.compile(rf'^SCAN (TABLE )?{table}\b(?!.*INDEX)')
+    ok = not any(full_scan.match(detail) for detail in details)
+    return ok, '; '.join(details)
+
+
+def check_query_plans():
+    """Plan de chaque requête fréquente : liste de (libellé, utilise un index, résumé du plan)"""
+    results = []
+    with db.engine.connect() as connection:
+        explain = _postgres_plan if connection.dialect.name == 'postgresql' else _sqlite_plan
+        for label, table, sql in HOT_QUERIES:
+            with connection.begin():
+                ok, plan = explain(connection, sql, table)
+            results.append((label, ok, plan))
+    return results
@@ -1,6 +1,8 @@
 from app import db
+from app import geo
 from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy import event, text
+from app.passwords import hash_password, verify_password
 
 class User(db.Model):
     __tablename__ = 'users'
@@ -10,10 +12,10 @@ class User(db.Model):
     role = db.Column(db.String(20), nullable=False)
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return verify_password(self.password_hash, password)
 
 class Species(db.Model):
     __tablename__ = 'species'
@@ -24,6 +26,18 @@ class Species(db.Model):
     created_by = db.Column(db.Integer, db.ForeignKey('users.id'))
     creator = db.relationship('User')
 
+    __table_args__ = (
+        db.Index('ix_species_scientific_name', 'scientific_name', unique=True),
+    )
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'common_name': self.common_name,
+            'scientific_name': self.scientific_name,
+            'description': self.description or ''
+        }
+
 class ConservationPlan(db.Model):
     __tablename__ = 'conservation_plans'
     id = db.Column(db.Integer, primary_key=True)
@@ -44,6 +58,12 @@ class ConservationPlan(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     creator = db.relationship('User')
+
+    __table_args__ = (
+        db.Index('ix_conservation_plans_espece', 'espece'),
+        db.Index('ix_conservation_plans_responsable', 'responsable'),
+        db.Index('ix_conservation_plans_dates', 'date_debut_taches', 'date_fin_taches'),
+    )
     
     @property
     def budget_total(self):
@@ -81,6 +101,162 @@ class Observation(db.Model):
     species_id = db.Column(db.Integer, db.ForeignKey('species.id'))
     latitude = db.Column(db.Float)
     longitude = db.Column(db.Float)
+    # Cellule geohash entière (voir app.geo) servant d'index spatial. Sur une
+    # base existante, la colonne est ajoutée et calculée par la migration m0002
+    # (flask init-db ou flask migrate) : sans elle, les filtres bbox ignorent
+    # les anciennes lignes
+    geocell = db.Column(db.BigInteger, index=True)
     observed_at = db.Column(db.DateTime, default=datetime.utcnow)
     notes = db.Column(db.Text)
-    species = db.relationship('Species')
\ No newline at end of file
+    # Identifiant fourni par l'appareil du ranger (clé d'idempotence des envois groupés)
+    client_uuid = db.Column(db.String(36))
+    species = db.relationship('Species')
+
+    __table_args__ = (
+        db.Index('ix_observations_client_uuid', 'client_uuid', unique=True),
+        db.Index('ix_observations_species_observed_at', 'species_id', 'observed_at'),
+        db.Index('ix_observations_observed_at', 'observed_at'),
+    )
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'species_id': self.species_id,
+            'lat': self.latitude,
+            'lng': self.longitude,
+            'latitude': self.latitude,  # Pour compatibilité
+            'longitude': self.longitude,  # Pour compatibilité
+            'observed_at': self.observed_at.isoformat(),
+            'notes': self.notes
+        }
+
+# Tables de synthèse tenues à jour par app.rollups. Sur une base existante,
+# elles sont créées et remplies par la migration m0002 (flask init-db ou
+# flask migrate) ; flask rebuild-stats les recalcule depuis les observations
+class SpeciesObservationCount(db.Model):
+    """Synthèse : nombre d'observations par espèce"""
+    __tablename__ = 'species_observation_counts'
+    species_id = db.Column(db.Integer, db.ForeignKey('species.id'), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    species = db.relationship('Species')
+
+class SpeciesMonthlyCount(db.Model):
+    """Synthèse : nombre d'observations par espèce et par mois"""
+    __tablename__ = 'species_monthly_counts'
+    species_id = db.Column(db.Integer, db.ForeignKey('species.id'), primary_key=True)
+    month = db.Column(db.DateTime, primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+class ChangeLog(db.Model):
+    """Journal des écritures : une ligne par création, modification ou suppression
+
+    L'id, croissant, sert de jeton de synchronisation (voir app.sync). Les
+    lignes sont insérées au moment du commit, sous un verrou consultatif :
+    les ids sont ainsi attribués dans l'ordre des commits, et aucun id
+    inférieur au jeton courant ne peut encore apparaître.
+    """
+    __tablename__ = 'change_log'
+    id = db.Column(db.BigInteger().with_variant(db.Integer, 'sqlite'), primary_key=True)
+    entity = db.Column(db.String(30), nullable=False)
+    entity_id = db.Column(db.Integer, nullable=False)
+
+class ImportJob(db.Model):
+    """Import de fichier en arrière-plan : état lisible depuis tous les workers (voir app.jobs)"""
+    __tablename__ = 'import_jobs'
+    id = db.Column(db.String(32), primary_key=True)
+    kind = db.Column(db.String(20), nullable=False)
+    filename = db.Column(db.String(255))
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'))
+    status = db.Column(db.String(20), nullable=False, default='queued')
+    rows_processed = db.Column(db.Integer, nullable=False, default=0)
+    rows_skipped = db.Column(db.Integer, nullable=False, default=0)
+    created = db.Column(db.Integer, nullable=False, default=0)
+    skipped_details = db.Column(db.JSON)
+    error = db.Column(db.Text)
+    request_id = db.Column(db.String(64))
+    submitted_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    # Mis à jour à chaque lot : un import sans nouvelles est considéré interrompu
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_import_jobs_finished_at', 'finished_at'),
+    )
+
+    def to_dict(self):
+        elapsed = None
+        if self.started_at:
+            elapsed = ((self.finished_at or datetime.utcnow()) - self.started_at).total_seconds()
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'filename': self.filename,
+            'status': self.status,
+            'rows_processed': self.rows_processed,
+            'rows_skipped': self.rows_skipped,
+            'created': self.created,
+            'skipped_details': self.skipped_details or [],
+            'elapsed_seconds': round(elapsed, 3) if elapsed is not None else None,
+            'rows_per_second': round(self.rows_processed / elapsed, 1) if elapsed else None,
+            'error': self.error
+        }
+
+@event.listens_for(Observation, 'before_insert')
+@event.listens_for(Observation, 'before_update')
+def _update_geocell(mapper, connection, target):
+    """Maintenir la cellule spatiale à jour à chaque écriture"""
+    if target.latitude is None or target.longitude is None:
+        target.geocell = None
+    else:
+        target.geocell = geo.encode(target.latitude, target.longitude)
+
+# Modèles suivis par le journal des écritures, avec leur nom d'entité
+TRACKED_ENTITIES = {
+    Species: 'species',
+    Observation: 'observations',
+    ConservationPlan: 'conservation_plans'
+}
+
+# Clé du verrou consultatif PostgreSQL qui sérialise l'écriture du journal
+CHANGE_LOG_LOCK_KEY = 7218350041
+
+def pending_changes(session):
+    """Écritures à journaliser au commit de la transaction en cours"""
+    return session.info.setdefault('pending_changes', [])
+
+@event.listens_for(db.session, 'after_flush')
+def _log_flushed_changes(session, flush_context):
+    """Retenir les écritures faites par l'ORM (les insertions en masse
+    passent par app.sync.record_changes)"""
+    rows = pending_changes(session)
+    for objects in (session.new, session.dirty, session.deleted):
+        for target in objects:
+            entity = TRACKED_ENTITIES.get(type(target))
+            if entity and target.id is not None and (objects is not session.dirty or session.is_modified(target)):
+                rows.append({'entity': entity, 'entity_id': target.id})
+
+@event.listens_for(db.session, 'before_commit')
+def _write_change_log(session):
+    """Insérer les écritures retenues juste avant le commit
+
+    Un id de séquence attribué au flush pourrait être validé après un id
+    plus grand, et un client ayant déjà reçu ce dernier comme jeton ne
+    verrait jamais la ligne. Le verrou, libéré seulement une fois le
+    commit visible, fait qu'une transaction ne prend ses ids qu'après le
+    commit des précédentes.
+    """
+    session.flush()
+    rows = session.info.pop('pending_changes', None)
+    if not rows:
+        return
+    connection = session.connection()
+    if connection.dialect.name == 'postgresql':
+        connection.execute(text('SELECT pg_advisory_xact_lock(:key)'), {'key': CHANGE_LOG_LOCK_KEY})
+    connection.execute(ChangeLog.__table__.insert(), rows)
+
+@event.listens_for(db.session, 'after_transaction_end')
+def _discard_change_log(session, transaction):
+    # Transaction annulée ou session fermée : rien à journaliser
+    if transaction.parent is None:
+        session.info.pop('pending_changes', None)
@@ -0,0 +1,86 @@
+from flask import Response, current_app, jsonify, stream_with_context
+from app.serialization import rows_as_objects
+
+NEXT_CURSOR_HEADER = 'X-Next-After-Id'
+STREAM_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'json': 'application/json',
+}
+
+
+def parse_page_args(args):
+    """Lire after_id/limit depuis la query string
+
+    Lève ValueError avec un message destiné au client si les valeurs sont invalides.
+    """
+    try:
+        after_id = int(args['after_id']) if args.get('after_id') else None
+        limit = int(args['limit']) if args.get('limit') else None
+    except ValueError:
+        raise ValueError('Paramètres de pagination invalides (after_id, limit)')
+    if limit is not None and limit <= 0:
+        raise ValueError('limit doit être strictement positif')
+    if limit is not None:
+        limit = min(limit, current_app.config['PAGE_SIZE_MAX'])
+    return after_id, limit
+
+
+def _stream(query, serialize, fmt):
+    """Générer le corps de la réponse par lots depuis un curseur serveur"""
+    dumps = current_app.json.dumps
+    batch_size = current_app.config['STREAM_BATCH_SIZE']
+    separator = '\n' if fmt == 'ndjson' else ','
+
+    if fmt == 'json':
+        yield '['
+    buffer = []
+    first = True
+    rows = query.yield_per(batch_size)
+    for item in map(serialize, rows) if serialize else rows_as_objects(rows):
+        buffer.append(dumps(item))
+        if len(buffer) >= batch_size:
+            yield ('' if first else separator) + separator.join(buffer)
+            first = False
+            buffer = []
+    if buffer:
+        yield ('' if first else separator) + separator.join(buffer)
+        first = False
+    if fmt == 'json':
+        yield ']'
+    elif not first:
+        yield '\n'
+
+
+def list_response(query, id_column, serialize, args):
+    """Réponse de liste avec pagination par clé et streaming optionnels
+
+    - sans paramètre : liste complète (comportement historique) ;
+    - ``after_id``/``limit`` : page triée par identifiant, le curseur suivant
+      est renvoyé dans l'en-tête ``X-Next-After-Id`` ;
+    - ``stream=ndjson|json`` : lignes lues par lots via ``yield_per`` et
+      envoyées au fil de l'eau.
+
+    Avec ``serialize=None``, les lignes SQL (requête sur des colonnes
+    nommées, dont ``id``) sont passées telles quelles au sérialiseur JSON.
+    """
+    after_id, limit = parse_page_args(args)
+    fmt = args.get('stream')
+    if fmt and fmt not in STREAM_FORMATS:
+        raise ValueError('stream doit valoir ndjson ou json')
+
+    query = query.order_by(id_column)
+    if after_id is not None:
+        query = query.filter(id_column > after_id)
+    if limit is not None:
+        query = query.limit(limit)
+
+    if fmt:
+        return Response(stream_with_context(_stream(query, serialize, fmt)),
+                        mimetype=STREAM_FORMATS[fmt])
+
+    items = [serialize(row) for row in query] if serialize else query.all()
+    response = jsonify(items)
+    if limit is not None and len(items) == limit:
+        last = items[-1]
+        response.headers[NEXT_CURSOR_HEADER] = str(last['id'] if isinstance(last, dict) else last.id)
+    return response
@@ -0,0 +1,89 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from flask import current_app
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash
+
+
+class PasswordHasherBusy(RuntimeError):
+    """File de vérification pleine ou attente trop longue"""
+
+
+def _normalize(method):
+    """Méthode werkzeug avec son coût explicite (pbkdf2:sha256 -> pbkdf2:sha256:260000)"""
+    parts = method.split(':')
+    if parts[0] == 'pbkdf2' and len(parts) == 2:
+        parts.append(str(DEFAULT_PBKDF2_ITERATIONS))
+    return ':'.join(parts)
+
+
+class PasswordHasher:
+    """Hachage et vérification des mots de passe dans un pool de threads borné
+
+    Le calcul (PBKDF2) libère le GIL mais occupe un cœur : limiter le nombre
+    de calculs simultanés laisse du CPU aux autres endpoints pendant un pic
+    de connexions. Au-delà de ``workers + queue_size`` demandes en cours,
+    ou après ``timeout`` secondes d'attente, PasswordHasherBusy est levée.
+    """
+
+    def __init__(self, method, workers=2, queue_size=32, timeout=10):
+        self.method = _normalize(method)
+        self.timeout = timeout
+        # Threads créés à la première demande, donc dans le worker après le fork
+        self._executor = ThreadPoolExecutor(workers, thread_name_prefix='password')
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHasherBusy('Trop de vérifications de mot de passe en attente')
+        try:
+            future = self._executor.submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(self.timeout)
+        except TimeoutError:
+            future.cancel()
+            raise PasswordHasherBusy('Vérification du mot de passe trop lente')
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, password_hash, password):
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """Le hachage a-t-il été produit avec une autre méthode ou un autre coût ?"""
+        return _normalize(password_hash.split('$', 1)[0]) != self.method
+
+
+def _hasher():
+    hasher = current_app.extensions.get('password_hasher')
+    if hasher is None:
+        # Application sans init_passwords (scripts, shell) : pool d'un seul thread
+        hasher = PasswordHasher(current_app.config['PASSWORD_HASH_METHOD'], workers=1)
+        current_app.extensions['password_hasher'] = hasher
+    return hasher
+
+
+def hash_password(password):
+    return _hasher().hash(password)
+
+
+def verify_password(password_hash, password):
+    return _hasher().verify(password_hash, password)
+
+
+def needs_rehash(password_hash):
+    return _hasher().needs_rehash(password_hash)
+
+
+def init_passwords(app):
+    """Attacher le pool de hachage des mots de passe à l'application"""
+    app.extensions['password_hasher'] = PasswordHasher(
+        app.config['PASSWORD_HASH_METHOD'],
+        app.config['PASSWORD_HASH_WORKERS'],
+        app.config['PASSWORD_HASH_QUEUE_SIZE'],
+        app.config['PASSWORD_HASH_TIMEOUT']
+    )
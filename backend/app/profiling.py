@@ -0,0 +1,74 @@
+import logging
+import time
+from collections import defaultdict
+from flask import current_app, g, request
+from app.querystats import request_query_stats, request_statements
+
+log = logging.getLogger(__name__)
+
+STATEMENT_PREVIEW = 200
+
+
+def _preview(statement):
+    return ' '.join(statement.split())[:STATEMENT_PREVIEW]
+
+
+def analyze(statements, config):
+    """Repérer dans les requêtes SQL d'une requête HTTP les répétitions (N+1) et les lenteurs"""
+    repeats = defaultdict(lambda: [0, 0.0])
+    for statement, elapsed in statements:
+        repeats[statement][0] += 1
+        repeats[statement][1] += elapsed
+    repeated = [
+        {'sql': _preview(statement), 'count': count, 'ms': round(total * 1000, 2)}
+        for statement, (count, total) in repeats.items()
+        if count >= config['SQL_REPEAT_THRESHOLD']
+    ]
+    slow = [
+        {'sql': _preview(statement), 'ms': round(elapsed * 1000, 2)}
+        for statement, elapsed in statements
+        if elapsed * 1000 >= config['SQL_SLOW_QUERY_MS']
+    ]
+    return repeated, slow
+
+
+def _profile(response):
+    start = g.get('metrics_start')
+    query_count, query_time = request_query_stats()
+    db_ms = query_time * 1000
+    response.headers['X-Query-Count'] = str(query_count)
+    timings = [f'db;dur={db_ms:.1f};desc="{query_count} SQL"']
+    if start is not None:
+        timings.append(f'app;dur={(time.perf_counter() - start) * 1000:.1f}')
+    response.headers['Server-Timing'] = ', '.join(timings)
+
+    config = current_app.config
+    repeated, slow = analyze(request_statements(), config)
+    problems = []
+    if query_count > config['SQL_QUERY_BUDGET']:
+        problems.append('query_budget')
+    if db_ms > config['SQL_TIME_BUDGET_MS']:
+        problems.append('time_budget')
+    if repeated:
+        problems.append('repeated_statements')
+    if slow:
+        problems.append('slow_queries')
+    if problems:
+        log.warning('sql_profile', extra={
+            'method': request.method,
+            'path': request.path,
+            'endpoint': request.endpoint,
+            'status': response.status_code,
+            'query_count': query_count,
+            'db_ms': round(db_ms, 2),
+            'problems': problems,
+            'repeated': repeated,
+            'slow': slow
+        })
+    return response
+
+
+def init_profiling(app):
+    """Profilage SQL par requête (optionnel, SQL_PROFILING=1)"""
+    if app.config['SQL_PROFILING']:
+        app.after_request(_profile)
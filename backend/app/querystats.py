@@ -0,0 +1,31 @@
+import time
+from flask import current_app, g, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(connection, cursor, statement, parameters, context, executemany):
+    if has_request_context():
+        connection.info.setdefault('query_start', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(connection, cursor, statement, parameters, context, executemany):
+    if not has_request_context() or not connection.info.get('query_start'):
+        return
+    elapsed = time.perf_counter() - connection.info['query_start'].pop()
+    g.query_count = g.get('query_count', 0) + 1
+    g.query_time = g.get('query_time', 0.0) + elapsed
+    if current_app.config['SQL_PROFILING']:
+        g.setdefault('queries', []).append((statement, elapsed))
+
+
+def request_query_stats():
+    """Nombre de requêtes SQL et temps passé en base (s) pendant la requête HTTP courante"""
+    return g.get('query_count', 0), g.get('query_time', 0.0)
+
+
+def request_statements():
+    """Requêtes SQL de la requête HTTP courante : liste de (SQL, durée en s), en mode profilage"""
+    return g.get('queries', [])
@@ -0,0 +1,105 @@
+from collections import Counter
+from datetime import datetime
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import func, insert, select
+from app import db
+from app.cache import invalidate
+from app.models import Observation, SpeciesMonthlyCount, SpeciesObservationCount
+from app.sqlutils import dialect_insert
+
+
+def month_start(value):
+    """Premier jour du mois d'une date d'observation"""
+    return datetime(value.year, value.month, 1)
+
+
+def _month_expr(dialect_name):
+    if dialect_name == 'sqlite':
+        # Même format de stockage que les DateTime écrits par SQLAlchemy
+        return func.strftime('%Y-%m-01 00:00:00.000000', Observation.observed_at)
+    return func.date_trunc('month', Observation.observed_at)
+
+
+def _upsert_increment(model, keys, rows):
+    """Ajouter des compteurs aux lignes existantes (INSERT ... ON CONFLICT DO UPDATE)"""
+    if not rows:
+        return
+    statement = dialect_insert(model)
+    statement = statement.on_conflict_do_update(
+        index_elements=keys,
+        set_={'count': model.__table__.c.count + statement.excluded.count}
+    )
+    db.session.execute(statement, rows)
+
+
+def record_observations(observations):
+    """Répercuter des observations dans les tables de synthèse
+
+    ``observations`` est un itérable de couples (species_id, observed_at).
+    À appeler dans la transaction qui insère les observations, avant le commit.
+    """
+    per_species = Counter()
+    per_month = Counter()
+    for species_id, observed_at in observations:
+        if species_id is None:
+            continue
+        per_species[species_id] += 1
+        if observed_at is not None:
+            per_month[(species_id, month_start(observed_at))] += 1
+
+    _upsert_increment(SpeciesObservationCount, ['species_id'], [
+        {'species_id': species_id, 'count': count}
+        for species_id, count in per_species.items()
+    ])
+    _upsert_increment(SpeciesMonthlyCount, ['species_id', 'month'], [
+        {'species_id': species_id, 'month': month, 'count': count}
+        for (species_id, month), count in per_month.items()
+    ])
+
+
+def species_counts(species_ids):
+    """Compteurs d'observations à jour pour les espèces données"""
+    rows = db.session.query(SpeciesObservationCount.species_id, SpeciesObservationCount.count).filter(
+        SpeciesObservationCount.species_id.in_(list(species_ids))
+    ).order_by(SpeciesObservationCount.species_id).all()
+    return [{'species_id': species_id, 'count': count} for species_id, count in rows]
+
+
+def populate(connection, dialect_name):
+    """Remplir les tables de synthèse (vides) depuis les observations, en SQL"""
+    connection.execute(insert(SpeciesObservationCount).from_select(
+        ['species_id', 'count'],
+        select(Observation.species_id, func.count(Observation.id))
+        .where(Observation.species_id.isnot(None))
+        .group_by(Observation.species_id)
+    ))
+    month = _month_expr(dialect_name)
+    connection.execute(insert(SpeciesMonthlyCount).from_select(
+        ['species_id', 'month', 'count'],
+        select(Observation.species_id, month, func.count(Observation.id))
+        .where(Observation.species_id.isnot(None), Observation.observed_at.isnot(None))
+        .group_by(Observation.species_id, month)
+    ))
+
+
+def rebuild():
+    """Recalculer entièrement les tables de synthèse depuis les observations"""
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        db.session.execute(db.text(
+            'LOCK TABLE species_observation_counts, species_monthly_counts IN EXCLUSIVE MODE'
+        ))
+    db.session.query(SpeciesObservationCount).delete()
+    db.session.query(SpeciesMonthlyCount).delete()
+    populate(db.session, dialect)
+    db.session.commit()
+    invalidate('observations')
+
+
+@click.command('rebuild-stats')
+@with_appcontext
+def rebuild_stats_command():
+    """Reconstruire les tables de synthèse des statistiques"""
+    rebuild()
+    click.echo('Tables de synthèse reconstruites')
@@ -1,9 +1,12 @@
+import logging
 from flask import Blueprint, request, jsonify
 from app import db
 from app.models import User
+from app.passwords import PasswordHasherBusy, needs_rehash
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
 
 auth_bp = Blueprint('auth', __name__)
+log = logging.getLogger(__name__)
 
 @auth_bp.route('/register', methods=['POST'])
 def register():
@@ -36,8 +39,11 @@ def register():
         
         return jsonify({'msg': 'Utilisateur créé avec succès'}), 201
         
-    except Exception as e:
-        print(f"Error in register: {e}")
+    except PasswordHasherBusy:
+        db.session.rollback()
+        return jsonify({'msg': 'Serveur occupé, réessayez dans un instant'}), 503, {'Retry-After': '1'}
+    except Exception:
+        log.exception("Error in register")
         db.session.rollback()
         return jsonify({'msg': 'Erreur lors de la création du compte'}), 500
 
@@ -57,10 +63,23 @@ def login():
         
         # Chercher l'utilisateur
         user = User.query.filter_by(username=username).first()
+        # Connexion rendue au pool avant la vérification : les connexions en
+        # file d'attente de hachage ne monopolisent pas le pool de la base
+        db.session.close()
         
         if not user or not user.check_password(password):
             return jsonify({'msg': 'Nom d\'utilisateur ou mot de passe incorrect'}), 401
         
+        # Hachage produit avec une méthode ou un coût différent de la configuration
+        if needs_rehash(user.password_hash):
+            try:
+                user.set_password(password)
+            except PasswordHasherBusy:
+                log.info("Password rehash deferred", extra={'user_id': user.id})
+            else:
+                db.session.add(user)
+                db.session.commit()
+        
         # Créer le token avec seulement l'ID utilisateur comme identité (string)
         access_token = create_access_token(identity=str(user.id))
         
@@ -73,8 +92,13 @@ def login():
             }
         }), 200
         
-    except Exception as e:
-        print(f"Error in login: {e}")
+    except PasswordHasherBusy:
+        log.warning("Login rejected: password hasher busy")
+        db.session.rollback()
+        return jsonify({'msg': 'Trop de connexions simultanées, réessayez dans un instant'}), 503, {'Retry-After': '1'}
+    except Exception:
+        log.exception("Error in login")
+        db.session.rollback()
         return jsonify({'msg': 'Erreur lors de la connexion'}), 500
 
 @auth_bp.route('/me', methods=['GET'])
@@ -94,6 +118,6 @@ def get_current_user():
             'role': user.role
         }), 200
         
-    except Exception as e:
-        print(f"Error in get_current_user: {e}")
+    except Exception:
+        log.exception("Error in get_current_user")
         return jsonify({'msg': 'Erreur lors de la récupération des informations utilisateur'}), 500
\ No newline at end of file
@@ -1,22 +1,66 @@
-from flask import Blueprint, request, jsonify
+import logging
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
+from app.cache import cached, invalidate
 from app.models import ConservationPlan
+from app.exporting import CONSERVATION_EXPORT_COLUMNS, export_response, parse_format
+from app.importing import run_import
+from app.jobs import wants_async
+from app.pagination import list_response, parse_page_args
+from app.serialization import parse_fields
 from datetime import datetime
-import pandas as pd
-import io
+from sqlalchemy import Integer, cast, distinct, func
 
 conservation_bp = Blueprint('conservation', __name__)
+log = logging.getLogger(__name__)
+
+def _plan_fields():
+    """Champs exposés des plans ; budget_total et duree_jours sont calculés par la base"""
+    if db.session.get_bind().dialect.name == 'sqlite':
+        duree = cast(func.julianday(ConservationPlan.date_fin_taches)
+                     - func.julianday(ConservationPlan.date_debut_taches), Integer)
+    else:
+        duree = ConservationPlan.date_fin_taches - ConservationPlan.date_debut_taches
+    return {
+        'id': ConservationPlan.id,
+        'espece': ConservationPlan.espece,
+        'nom_scientifique': ConservationPlan.nom_scientifique,
+        'activite': ConservationPlan.activite,
+        'sous_activite': ConservationPlan.sous_activite,
+        'taches': ConservationPlan.taches,
+        'responsable': ConservationPlan.responsable,
+        'date_debut_taches': ConservationPlan.date_debut_taches,
+        'date_fin_taches': ConservationPlan.date_fin_taches,
+        'budget_annee_1': ConservationPlan.budget_annee_1,
+        'budget_annee_2': ConservationPlan.budget_annee_2,
+        'budget_annee_3': ConservationPlan.budget_annee_3,
+        'budget_annee_4': ConservationPlan.budget_annee_4,
+        'budget_annee_5': ConservationPlan.budget_annee_5,
+        'budget_total': (ConservationPlan.budget_annee_1 + ConservationPlan.budget_annee_2
+                         + ConservationPlan.budget_annee_3 + ConservationPlan.budget_annee_4
+                         + ConservationPlan.budget_annee_5),
+        'duree_jours': duree,
+        'created_at': ConservationPlan.created_at
+    }
+
+def _plan_columns(args):
+    """Colonnes sélectionnées via ?fields= (tous les champs par défaut)"""
+    fields = _plan_fields()
+    return parse_fields(args, fields, list(fields))
 
 @conservation_bp.route('', methods=['GET'])
 @jwt_required()
+@cached('conservation')
 def list_conservation_plans():
     """Récupérer tous les plans de conservation"""
     try:
-        plans = ConservationPlan.query.all()
-        return jsonify([plan.to_dict() for plan in plans]), 200
-    except Exception as e:
-        print(f"Error in list_conservation_plans: {e}")
+        query = db.session.query(*_plan_columns(request.args))
+        return list_response(query, ConservationPlan.id, None, request.args), 200
+    except ValueError as e:
+        return jsonify({'msg': str(e)}), 400
+    except Exception:
+        log.exception("Error in list_conservation_plans")
         return jsonify({'msg': 'Erreur lors de la récupération des plans'}), 500
 
 @conservation_bp.route('', methods=['POST'])
@@ -66,14 +110,15 @@ def create_conservation_plan():
         
         db.session.add(plan)
         db.session.commit()
+        invalidate('conservation')
         
         return jsonify({
             'id': plan.id,
             'msg': 'Plan de conservation créé avec succès'
         }), 201
         
-    except Exception as e:
-        print(f"Error in create_conservation_plan: {e}")
+    except Exception:
+        log.exception("Error in create_conservation_plan")
         db.session.rollback()
         return jsonify({'msg': 'Erreur lors de la création du plan'}), 500
 
@@ -89,120 +134,25 @@ def import_conservation_plans():
         if file.filename == '':
             return jsonify({'msg': 'Aucun fichier sélectionné'}), 400
         
-        # Lire le fichier
-        file_content = file.read()
-        filename = file.filename.lower()
-        
-        try:
-            if filename.endswith('.xlsx') or filename.endswith('.xls'):
-                df = pd.read_excel(io.BytesIO(file_content))
-            elif filename.endswith('.csv'):
-                df = pd.read_csv(io.BytesIO(file_content))
-            else:
-                return jsonify({'msg': 'Format de fichier non supporté'}), 400
-        except Exception as e:
-            return jsonify({'msg': 'Erreur lors de la lecture du fichier'}), 400
-        
-        if df.empty:
-            return jsonify({'msg': 'Le fichier est vide'}), 400
-        
-        # Normaliser les colonnes
-        df.columns = df.columns.str.strip()
-        
-        # Mapping des colonnes
-        column_mapping = {
-            'Espèce': 'espece',
-            'Nom scientifique': 'nom_scientifique',
-            'Activité': 'activite',
-            'Sous-activité': 'sous_activite',
-            'Tâches': 'taches',
-            'Responsable': 'responsable',
-            'date debut taches': 'date_debut_taches',
-            'date fin taches': 'date_fin_taches',
-            'Budget Année 1': 'budget_annee_1',
-            'Budget Année 2': 'budget_annee_2',
-            'Budget Année 3': 'budget_annee_3',
-            'Budget Année 4': 'budget_annee_4',
-            'Budget Année 5': 'budget_annee_5'
-        }
-        
-        # Appliquer le mapping
-        for old_name, new_name in column_mapping.items():
-            if old_name in df.columns:
-                df = df.rename(columns={old_name: new_name})
-        
-        # Vérifier les colonnes requises
-        required_columns = ['espece', 'nom_scientifique', 'activite', 'taches', 
-                           'responsable', 'date_debut_taches', 'date_fin_taches']
-        missing_columns = [col for col in required_columns if col not in df.columns]
-        
-        if missing_columns:
-            return jsonify({
-                'msg': f'Colonnes manquantes: {", ".join(missing_columns)}'
-            }), 400
-        
         user_id = int(get_jwt_identity())
-        created_plans = []
-        skipped_plans = []
         
-        for index, row in df.iterrows():
-            try:
-                # Vérifier les champs requis
-                espece = str(row['espece']).strip() if pd.notna(row['espece']) else ''
-                nom_scientifique = str(row['nom_scientifique']).strip() if pd.notna(row['nom_scientifique']) else ''
-                
-                if not espece or not nom_scientifique:
-                    skipped_plans.append(f"Ligne {index + 2}: espèce ou nom scientifique manquant")
-                    continue
-                
-                # Traitement des dates
-                try:
-                    if pd.notna(row['date_debut_taches']):
-                        if isinstance(row['date_debut_taches'], str):
-                            date_debut = datetime.strptime(row['date_debut_taches'], '%Y-%m-%d').date()
-                        else:
-                            date_debut = row['date_debut_taches'].date()
-                    else:
-                        raise ValueError("Date début manquante")
-                    
-                    if pd.notna(row['date_fin_taches']):
-                        if isinstance(row['date_fin_taches'], str):
-                            date_fin = datetime.strptime(row['date_fin_taches'], '%Y-%m-%d').date()
-                        else:
-                            date_fin = row['date_fin_taches'].date()
-                    else:
-                        raise ValueError("Date fin manquante")
-                except Exception:
-                    skipped_plans.append(f"Ligne {index + 2}: dates invalides")
-                    continue
-                
-                # Créer le plan
-                plan = ConservationPlan(
-                    espece=espece,
-                    nom_scientifique=nom_scientifique,
-                    activite=str(row.get('activite', '')).strip(),
-                    sous_activite=str(row.get('sous_activite', '')).strip(),
-                    taches=str(row.get('taches', '')).strip(),
-                    responsable=str(row.get('responsable', '')).strip(),
-                    date_debut_taches=date_debut,
-                    date_fin_taches=date_fin,
-                    budget_annee_1=float(row.get('budget_annee_1', 0) or 0),
-                    budget_annee_2=float(row.get('budget_annee_2', 0) or 0),
-                    budget_annee_3=float(row.get('budget_annee_3', 0) or 0),
-                    budget_annee_4=float(row.get('budget_annee_4', 0) or 0),
-                    budget_annee_5=float(row.get('budget_annee_5', 0) or 0),
-                    created_by=user_id
-                )
-                
-                db.session.add(plan)
-                created_plans.append(espece)
-                
-            except Exception as e:
-                skipped_plans.append(f"Ligne {index + 2}: erreur - {str(e)}")
-                continue
+        try:
+            # Mode asynchrone : le fichier est stocké et traité en arrière-plan
+            if wants_async(request.args):
+                job_id = current_app.extensions['import_jobs'].submit('conservation', file, user_id)
+                return jsonify({
+                    'msg': 'Import planifié',
+                    'job_id': job_id,
+                    'status_url': f'/api/import/jobs/{job_id}'
+                }), 202
+            
+            # Lecture, nettoyage et insertion par lots
+            result = run_import('conservation', file.stream, file.filename, user_id)
+        except ValueError as e:
+            return jsonify({'msg': str(e)}), 400
         
-        if created_plans:
-            db.session.commit()
+        created_plans = result['created']
+        skipped_plans = result['skipped']
         
         return jsonify({
             'msg': 'Import terminé',
@@ -213,12 +163,27 @@ def import_conservation_plans():
         }), 201
         
     except Exception as e:
-        print(f"Error in import_conservation_plans: {e}")
+        log.exception("Error in import_conservation_plans")
         db.session.rollback()
         return jsonify({'msg': f'Erreur lors de l\'import: {str(e)}'}), 500
 
+@conservation_bp.route('/export', methods=['GET'])
+@jwt_required()
+def export_conservation_plans():
+    """Exporter les plans (format=csv|xlsx|parquet) avec les en-têtes du fichier d'import"""
+    try:
+        fmt = parse_format(request.args)
+        return export_response(db.session.query(ConservationPlan), ConservationPlan.id,
+                               CONSERVATION_EXPORT_COLUMNS, fmt, 'plans_conservation')
+    except ValueError as e:
+        return jsonify({'msg': str(e)}), 400
+    except Exception:
+        log.exception("Error in export_conservation_plans")
+        return jsonify({'msg': 'Erreur lors de l\'export des plans'}), 500
+
 @conservation_bp.route('/gantt', methods=['GET'])
 @jwt_required()
+@cached('conservation')
 def get_gantt_data():
     """Récupérer les données pour le diagramme de Gantt"""
     try:
@@ -242,52 +207,89 @@ def get_gantt_data():
         
         return jsonify(gantt_data), 200
         
-    except Exception as e:
-        print(f"Error in get_gantt_data: {e}")
+    except Exception:
+        log.exception("Error in get_gantt_data")
         return jsonify({'msg': 'Erreur lors de la récupération des données Gantt'}), 500
 
 @conservation_bp.route('/rapport', methods=['GET'])
 @jwt_required()
+@cached('conservation')
 def generate_rapport():
-    """Générer un rapport de suivi des espèces"""
+    """Générer un rapport de suivi des espèces
+
+    Les totaux sont agrégés par la base (GROUP BY/SUM) ; le détail des plans
+    n'est renvoyé qu'avec ?details=1, paginé par after_id/limit.
+    """
     try:
-        plans = ConservationPlan.query.all()
+        budget_columns = [
+            ConservationPlan.budget_annee_1,
+            ConservationPlan.budget_annee_2,
+            ConservationPlan.budget_annee_3,
+            ConservationPlan.budget_annee_4,
+            ConservationPlan.budget_annee_5
+        ]
+        year_sums = [func.coalesce(func.sum(column), 0) for column in budget_columns]
+        plan_budget = sum(func.coalesce(column, 0) for column in budget_columns)
+        budget_sum = func.coalesce(func.sum(plan_budget), 0)
         
-        # Statistiques générales
-        total_plans = len(plans)
-        total_budget = sum(plan.budget_total for plan in plans)
-        especes_uniques = len(set(plan.espece for plan in plans))
+        # Statistiques générales et budget par année en une seule requête
+        total_plans, especes_uniques, *annual = db.session.query(
+            func.count(ConservationPlan.id),
+            func.count(distinct(ConservationPlan.espece)),
+            *year_sums
+        ).one()
+        budgets_annuels = {f'annee_{year}': annual[year - 1] for year in range(1, 6)}
         
         # Plans par responsable
         responsables = {}
-        for plan in plans:
-            if plan.responsable not in responsables:
-                responsables[plan.responsable] = []
-            responsables[plan.responsable].append(plan.to_dict())
+        for responsable, count, budget in db.session.query(
+            ConservationPlan.responsable, func.count(ConservationPlan.id), budget_sum
+        ).group_by(ConservationPlan.responsable).order_by(ConservationPlan.responsable):
+            responsables[responsable] = {'nombre_plans': count, 'budget_total': budget}
         
-        # Budget par année
-        budgets_annuels = {
-            'annee_1': sum(plan.budget_annee_1 for plan in plans),
-            'annee_2': sum(plan.budget_annee_2 for plan in plans),
-            'annee_3': sum(plan.budget_annee_3 for plan in plans),
-            'annee_4': sum(plan.budget_annee_4 for plan in plans),
-            'annee_5': sum(plan.budget_annee_5 for plan in plans)
-        }
+        # Plans par espèce
+        especes = {}
+        for espece, count, budget, debut, fin in db.session.query(
+            ConservationPlan.espece,
+            func.count(ConservationPlan.id),
+            budget_sum,
+            func.min(ConservationPlan.date_debut_taches),
+            func.max(ConservationPlan.date_fin_taches)
+        ).group_by(ConservationPlan.espece).order_by(ConservationPlan.espece):
+            especes[espece] = {
+                'nombre_plans': count,
+                'budget_total': budget,
+                'date_debut': debut,
+                'date_fin': fin
+            }
         
         rapport = {
             'resume': {
                 'total_plans': total_plans,
-                'total_budget': total_budget,
+                'total_budget': sum(annual),
                 'especes_uniques': especes_uniques,
-                'date_generation': datetime.now().isoformat()
+                'date_generation': datetime.now()
             },
             'budgets_annuels': budgets_annuels,
             'responsables': responsables,
-            'plans': [plan.to_dict() for plan in plans]
+            'especes': especes
         }
         
+        # Détail des plans, uniquement sur demande
+        if request.args.get('details', '').lower() in ('1', 'true', 'yes'):
+            after_id, limit = parse_page_args(request.args)
+            limit = limit or current_app.config['PAGE_SIZE_MAX']
+            query = db.session.query(*_plan_columns(request.args)).order_by(ConservationPlan.id)
+            if after_id is not None:
+                query = query.filter(ConservationPlan.id > after_id)
+            plans = query.limit(limit).all()
+            rapport['plans'] = plans
+            rapport['next_after_id'] = plans[-1].id if len(plans) == limit else None
+        
         return jsonify(rapport), 200
         
-    except Exception as e:
-        print(f"Error in generate_rapport: {e}")
+    except ValueError as e:
+        return jsonify({'msg': str(e)}), 400
+    except Exception:
+        log.exception("Error in generate_rapport")
         return jsonify({'msg': 'Erreur lors de la génération du rapport'}), 500
\ No newline at end of file
@@ -1,51 +1,174 @@
-from flask import Blueprint, request, jsonify
+import logging
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required
+from sqlalchemy import func
+import json
 from app import db
+from app import geo
+from app.cache import cached, invalidate
+from app.events import publish
+from app.exporting import OBSERVATION_EXPORT_COLUMNS, export_response, parse_format
+from app.ingest import ingest_observations
 from app.models import Observation
+from app.pagination import list_response
+from app.rollups import record_observations, species_counts
+from app.serialization import parse_fields
+from app.sqlutils import chunked
 
 obs_bp = Blueprint('obs', __name__)
+log = logging.getLogger(__name__)
+
+# Champs exposés par la liste ; lat/lng (doublons historiques) sur demande via ?fields=
+OBSERVATION_FIELDS = {
+    'id': Observation.id,
+    'species_id': Observation.species_id,
+    'latitude': Observation.latitude,
+    'longitude': Observation.longitude,
+    'lat': Observation.latitude,
+    'lng': Observation.longitude,
+    'observed_at': Observation.observed_at,
+    'notes': Observation.notes
+}
+DEFAULT_OBSERVATION_FIELDS = ['id', 'species_id', 'latitude', 'longitude', 'observed_at', 'notes']
+
+def _apply_filters(query, args):
+    """Appliquer les filtres communs (espèce, date, bbox)
+
+    Lève ValueError avec un message destiné au client si un filtre est invalide.
+    """
+    if args.get('species'):
+        try:
+            species_id = int(args['species'])
+        except ValueError:
+            raise ValueError('ID d\'espèce invalide')
+        query = query.filter(Observation.species_id == species_id)
+    
+    if args.get('from'):
+        query = query.filter(Observation.observed_at >= args['from'])
+    
+    # Restreindre aux cellules visibles de la carte
+    if args.get('bbox'):
+        try:
+            bbox = geo.parse_bbox(args['bbox'])
+            zoom = geo.parse_zoom(args.get('zoom'))
+        except ValueError as e:
+            raise ValueError(f'Paramètres de carte invalides: {e}')
+        query = query.filter(geo.bbox_clause(
+            bbox, Observation.geocell, Observation.latitude, Observation.longitude, zoom
+        ))
+    
+    return query
 
 @obs_bp.route('', methods=['GET'])
 @jwt_required()
+@cached('observations')
 def get_obs():
+    try:
+        columns = parse_fields(request.args, OBSERVATION_FIELDS, DEFAULT_OBSERVATION_FIELDS)
+        query = _apply_filters(db.session.query(*columns), request.args)
+        return list_response(query, Observation.id, None, request.args), 200
+        
+    except ValueError as e:
+        return jsonify({'msg': str(e)}), 400
+    except Exception:
+        log.exception("Error in get_obs")
+        return jsonify({'msg': 'Erreur lors de la récupération des observations'}), 500
+
+@obs_bp.route('/clusters', methods=['GET'])
+@jwt_required()
+@cached('observations')
+def get_clusters():
+    """Regrouper les observations par cellule geohash pour l'affichage carte"""
     try:
         args = request.args
-        query = Observation.query
+        try:
+            query = _apply_filters(db.session.query(Observation), args)
+            bbox = geo.parse_bbox(args['bbox']) if args.get('bbox') else (-180.0, -90.0, 180.0, 90.0)
+            zoom = geo.parse_zoom(args.get('zoom'))
+        except ValueError as e:
+            return jsonify({'msg': str(e)}), 400
         
-        # Filtres optionnels
-        if args.get('species'):
-            try:
-                species_id = int(args['species'])
-                query = query.filter_by(species_id=species_id)
-            except ValueError:
-                return jsonify({'msg': 'ID d\'espèce invalide'}), 400
+        # La précision suit le zoom, plafonnée pour couvrir la bbox (le monde
+        # entier par défaut) en MAX_CLUSTER_CELLS cellules au plus : la taille
+        # de la réponse dépend de l'écran, pas du volume
+        max_precision = geo.zoom_to_precision(zoom) if zoom is not None else geo.MAX_PRECISION
+        precision = geo.covering_precision(bbox, max_precision, max_cells=geo.MAX_CLUSTER_CELLS)
+        shift = 2 * geo.CELL_BITS - 5 * precision
+        cell = Observation.geocell.op('>>')(shift).label('cell')
         
-        if args.get('from'):
-            try:
-                query = query.filter(Observation.observed_at >= args['from'])
-            except Exception:
-                return jsonify({'msg': 'Format de date invalide'}), 400
+        rows = query.with_entities(
+            cell,
+            Observation.species_id,
+            func.count(Observation.id),
+            func.avg(Observation.latitude),
+            func.avg(Observation.longitude)
+        ).filter(Observation.geocell.isnot(None)).group_by(cell, Observation.species_id).all()
         
-        observations = query.all()
+        # Fusion des sous-groupes par espèce (au plus cellules × espèces lignes)
+        clusters = {}
+        for cell_id, species_id, count, lat, lng in rows:
+            cluster = clusters.setdefault(cell_id, {'count': 0, 'lat': 0.0, 'lng': 0.0, 'species': {}})
+            cluster['count'] += count
+            cluster['lat'] += lat * count
+            cluster['lng'] += lng * count
+            cluster['species'][str(species_id)] = count
         
         result = []
-        for obs in observations:
+        for cell_id, cluster in clusters.items():
             result.append({
-                'id': obs.id,
-                'species_id': obs.species_id,
-                'lat': obs.latitude,
-                'lng': obs.longitude,
-                'latitude': obs.latitude,  # Pour compatibilité
-                'longitude': obs.longitude,  # Pour compatibilité
-                'observed_at': obs.observed_at.isoformat(),
-                'notes': obs.notes
+                'cell': geo.cell_to_geohash(cell_id, precision),
+                'count': cluster['count'],
+                'lat': cluster['lat'] / cluster['count'],
+                'lng': cluster['lng'] / cluster['count'],
+                'species': cluster['species']
             })
         
-        return jsonify(result), 200
+        return jsonify({'precision': precision, 'clusters': result}), 200
         
-    except Exception as e:
-        print(f"Error in get_obs: {e}")
-        return jsonify({'msg': 'Erreur lors de la récupération des observations'}), 500
+    except Exception:
+        log.exception("Error in get_clusters")
+        return jsonify({'msg': 'Erreur lors du regroupement des observations'}), 500
+
+def _publish_created(observation_ids, species_ids):
+    """Pousser aux abonnés du flux les observations validées et les compteurs à jour
+
+    Les événements ne portent que des ids et des compteurs, par paquets
+    bornés, pour tenir dans une notification PostgreSQL : les abonnés
+    relisent les observations via /api/observations ou /api/sync. Un
+    échec de diffusion n'annule pas l'écriture.
+    """
+    config = current_app.config
+    try:
+        publish('observations', {
+            'total': len(observation_ids),
+            'ids': observation_ids[:config['STREAM_EVENT_MAX_ITEMS']]
+        })
+    except Exception:
+        log.exception("Error publishing observations")
+    try:
+        counts = species_counts(species_ids)
+        for chunk in chunked(counts, config['STREAM_STATS_MAX_SPECIES']):
+            publish('stats', {'counts': chunk})
+    except Exception:
+        log.exception("Error publishing stats")
+
+@obs_bp.route('/export', methods=['GET'])
+@jwt_required()
+def export_obs():
+    """Exporter les observations filtrées (format=csv|xlsx|parquet)
+
+    Export en lecture seule, sans chemin de réimport : la colonne uuid
+    est vide pour les observations saisies via POST /api/observations.
+    """
+    try:
+        fmt = parse_format(request.args)
+        query = _apply_filters(db.session.query(Observation), request.args)
+        return export_response(query, Observation.id, OBSERVATION_EXPORT_COLUMNS, fmt, 'observations')
+    except ValueError as e:
+        return jsonify({'msg': str(e)}), 400
+    except Exception:
+        log.exception("Error in export_obs")
+        return jsonify({'msg': 'Erreur lors de l\'export des observations'}), 500
 
 @obs_bp.route('', methods=['POST'])
 @jwt_required()
@@ -84,14 +207,72 @@ def add_obs():
         )
         
         db.session.add(observation)
+        db.session.flush()
+        # Mise à jour des synthèses dans la même transaction
+        record_observations([(observation.species_id, observation.observed_at)])
         db.session.commit()
+        invalidate('observations')
+        _publish_created([observation.id], [observation.species_id])
         
         return jsonify({
             'id': observation.id,
             'msg': 'Observation créée avec succès'
         }), 201
         
-    except Exception as e:
-        print(f"Error in add_obs: {e}")
+    except Exception:
+        log.exception("Error in add_obs")
+        db.session.rollback()
+        return jsonify({'msg': 'Erreur lors de la création de l\'observation'}), 500
+
+def _read_batch():
+    """Lire le corps d'un envoi groupé : tableau JSON ou NDJSON (un objet par ligne)
+
+    Lève ValueError avec un message destiné au client si le corps est invalide.
+    """
+    if request.mimetype in ('application/x-ndjson', 'application/jsonlines'):
+        items = []
+        for number, line in enumerate(request.stream, start=1):
+            if line.strip():
+                try:
+                    items.append(json.loads(line))
+                except ValueError:
+                    raise ValueError(f'Ligne NDJSON invalide: {number}')
+        return items
+    items = request.get_json(silent=True)
+    if not isinstance(items, list):
+        raise ValueError('Un tableau JSON d\'observations est attendu')
+    return items
+
+@obs_bp.route('/batch', methods=['POST'])
+@jwt_required()
+def add_obs_batch():
+    """Enregistrer un lot d'observations synchronisées depuis le terrain"""
+    try:
+        try:
+            items = _read_batch()
+        except ValueError as e:
+            return jsonify({'msg': str(e)}), 400
+        
+        if not items:
+            return jsonify({'msg': 'Aucune donnée fournie'}), 400
+        
+        max_items = current_app.config['BATCH_MAX_ITEMS']
+        if len(items) > max_items:
+            return jsonify({'msg': f'Lot trop volumineux (maximum {max_items} observations)'}), 413
+        
+        result = ingest_observations(items)
+        db.session.commit()
+        if result['created']:
+            invalidate('observations')
+            created = [r for r in result['results'] if r['status'] == 'created']
+            _publish_created(
+                [r['id'] for r in created],
+                {int(float(items[r['index']]['species_id'])) for r in created}
+            )
+        
+        return jsonify(result), 200
+        
+    except Exception:
+        log.exception("Error in add_obs_batch")
         db.session.rollback()
-        return jsonify({'msg': 'Erreur lors de la création de l\'observation'}), 500
\ No newline at end of file
+        return jsonify({'msg': 'Erreur lors de l\'enregistrement du lot d\'observations'}), 500
\ No newline at end of file
@@ -1,62 +1,48 @@
+import logging
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
+from app.cache import cached, invalidate
 from app.models import Species
+from app.pagination import list_response
 
 species_bp = Blueprint('species', __name__)
+log = logging.getLogger(__name__)
 
 @species_bp.route('', methods=['GET'])
 @jwt_required()
+@cached('species')
 def list_species():
-    print("=== GET /api/species called ===")
     try:
-        print("Querying species...")
-        species_list = Species.query.all()
-        print(f"Found {len(species_list)} species")
-        
-        result = []
-        for s in species_list:
-            result.append({
-                'id': s.id,
-                'common_name': s.common_name,
-                'scientific_name': s.scientific_name,
-                'description': s.description or ''
-            })
-        
-        print(f"Returning {len(result)} species")
-        return jsonify(result), 200
+        return list_response(Species.query, Species.id, Species.to_dict, request.args), 200
         
+    except ValueError as e:
+        return jsonify({'msg': str(e)}), 400
     except Exception as e:
-        print(f"❌ Error in list_species: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("Error in list_species")
         return jsonify({'msg': 'Erreur lors de la récupération des espèces', 'error': str(e)}), 500
 
 @species_bp.route('', methods=['POST'])
 @jwt_required()
 def create_species():
-    print("=== POST /api/species called ===")
     try:
         data = request.get_json()
-        print(f"Received data: {data}")
         
         if not data:
-            print("❌ No data provided")
             return jsonify({'msg': 'Aucune donnée fournie'}), 400
             
         common_name = data.get('common_name', '').strip()
         scientific_name = data.get('scientific_name', '').strip()
         
         if not common_name or not scientific_name:
-            print(f"❌ Missing required fields: common_name='{common_name}', scientific_name='{scientific_name}'")
             return jsonify({'msg': 'Nom commun et nom scientifique requis'}), 400
         
-        print("Getting user identity...")
+        if Species.query.filter_by(scientific_name=scientific_name).first():
+            return jsonify({'msg': 'Une espèce avec ce nom scientifique existe déjà'}), 409
+        
         user_id_str = get_jwt_identity()  # Maintenant c'est un string
         user_id = int(user_id_str)  # Convertir en entier
-        print(f"User ID: {user_id}")
         
-        print("Creating species...")
         species = Species(
             common_name=common_name,
             scientific_name=scientific_name,
@@ -64,19 +50,17 @@ def create_species():
             created_by=user_id
         )
         
-        print("Adding to database...")
         db.session.add(species)
         db.session.commit()
+        invalidate('species')
         
-        print(f"✅ Species created with ID: {species.id}")
+        log.info("Species created", extra={'species_id': species.id, 'user_id': user_id})
         return jsonify({
             'id': species.id,
             'msg': 'Espèce créée avec succès'
         }), 201
         
     except Exception as e:
-        print(f"❌ Error in create_species: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("Error in create_species")
         db.session.rollback()
         return jsonify({'msg': 'Erreur lors de la création de l\'espèce', 'error': str(e)}), 500
\ No newline at end of file
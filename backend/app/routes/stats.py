@@ -1,67 +1,131 @@
-from flask import Blueprint, jsonify
+import logging
+from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required
 from app import db
-from app.models import Species, Observation
+from app import geo
+from app.cache import cached
+from app.models import Observation, Species, SpeciesMonthlyCount, SpeciesObservationCount
+from datetime import datetime, timedelta
 from sqlalchemy import func
 
 stats_bp = Blueprint('stats', __name__)
+log = logging.getLogger(__name__)
+
+POPULATION_SORTS = {'count', 'name'}
+
+def _parse_date_arg(args, name):
+    if not args.get(name):
+        return None
+    try:
+        return datetime.fromisoformat(args[name])
+    except ValueError:
+        raise ValueError(f'Format de date invalide pour {name} (AAAA-MM-JJ)')
+
+def _date_to_clause(args, column):
+    """Filtre de la borne ``to``, incluse : une date sans heure couvre toute la journée"""
+    date_to = _parse_date_arg(args, 'to')
+    if date_to is None:
+        return None
+    if 'T' not in args['to'] and ' ' not in args['to']:
+        return column < date_to + timedelta(days=1)
+    return column <= date_to
 
 @stats_bp.route('/population', methods=['GET'])
 @jwt_required()
+@cached('observations', 'species')
 def pop():
-    print("=== GET /api/stats/population called ===")
+    """Nombre d'observations par espèce
+
+    Filtres optionnels : from/to (dates), bbox/zoom, top (N premières
+    espèces), sort=count|name et order=asc|desc, tous évalués en base.
+    Sans filtre de date ou de zone, la synthèse par espèce est utilisée.
+    """
     try:
-        print("Querying population data...")
+        args = request.args
+        try:
+            date_from = _parse_date_arg(args, 'from')
+            to_clause = _date_to_clause(args, Observation.observed_at)
+            bbox = geo.parse_bbox(args['bbox']) if args.get('bbox') else None
+            zoom = geo.parse_zoom(args.get('zoom'))
+            top = int(args['top']) if args.get('top') else None
+        except ValueError as e:
+            return jsonify({'msg': str(e)}), 400
+        sort = args.get('sort', 'count')
+        order = args.get('order', 'desc' if sort == 'count' else 'asc')
+        if sort not in POPULATION_SORTS or order not in ('asc', 'desc') or (top is not None and top <= 0):
+            return jsonify({'msg': 'Paramètres de tri invalides (sort=count|name, order=asc|desc, top>0)'}), 400
+        
+        if date_from is None and to_clause is None and bbox is None:
+            # Lecture de la synthèse par espèce (une ligne par espèce)
+            count = SpeciesObservationCount.count
+            query = db.session.query(Species.id, Species.common_name, count).join(
+                SpeciesObservationCount, Species.id == SpeciesObservationCount.species_id
+            ).filter(count > 0)
+        else:
+            # Agrégat joint sur les observations filtrées
+            count = func.count(Observation.id)
+            query = db.session.query(Species.id, Species.common_name, count).join(
+                Observation, Observation.species_id == Species.id
+            )
+            if date_from is not None:
+                query = query.filter(Observation.observed_at >= date_from)
+            if to_clause is not None:
+                query = query.filter(to_clause)
+            if bbox is not None:
+                query = query.filter(geo.bbox_clause(
+                    bbox, Observation.geocell, Observation.latitude, Observation.longitude, zoom
+                ))
+            query = query.group_by(Species.id, Species.common_name)
         
-        # Approche simple : compter les observations par espèce
-        observations = db.session.query(
-            Observation.species_id, 
-            func.count(Observation.id).label('count')
-        ).group_by(Observation.species_id).all()
+        sort_column = count if sort == 'count' else Species.common_name
+        sort_column = sort_column.desc() if order == 'desc' else sort_column.asc()
+        query = query.order_by(sort_column, Species.id)
+        if top is not None:
+            query = query.limit(top)
+        rows = query.all()
         
-        print(f"Found {len(observations)} species with observations")
+        log.debug("Population stats: %d species", len(rows))
         
         result = []
-        for species_id, count in observations:
-            # Récupérer le nom de l'espèce
-            species = Species.query.get(species_id)
-            if species:
-                result.append({
-                    'species': species.common_name or f"Espèce {species_id}",
-                    'count': count
-                })
+        for species_id, common_name, species_count in rows:
+            result.append({
+                'species_id': species_id,
+                'species': common_name or f"Espèce {species_id}",
+                'count': species_count
+            })
         
-        print(f"Returning {len(result)} population records")
         return jsonify(result), 200
         
     except Exception as e:
-        print(f"❌ Error in population stats: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("Error in population stats")
         return jsonify({'msg': 'Erreur lors de la récupération des statistiques de population', 'error': str(e)}), 500
 
+@stats_bp.route('/totals', methods=['GET'])
+@jwt_required()
+@cached('observations', 'species')
+def totals():
+    """Nombre d'espèces et d'observations, lu dans la synthèse par espèce"""
+    try:
+        species = db.session.query(func.count(Species.id)).scalar()
+        observations = db.session.query(func.sum(SpeciesObservationCount.count)).scalar() or 0
+        return jsonify({'species': species, 'observations': int(observations)}), 200
+        
+    except Exception:
+        log.exception("Error in totals stats")
+        return jsonify({'msg': 'Erreur lors de la récupération des totaux'}), 500
+
 @stats_bp.route('/timeline', methods=['GET'])
 @jwt_required()
+@cached('observations')
 def timeline():
-    print("=== GET /api/stats/timeline called ===")
     try:
-        print("Querying timeline data...")
-        
-        # Vérifier d'abord s'il y a des observations
-        observation_count = Observation.query.count()
-        print(f"Total observations: {observation_count}")
-        
-        if observation_count == 0:
-            print("No observations found, returning empty array")
-            return jsonify([]), 200
-        
-        # Requête simplifiée pour la timeline
+        # Somme des synthèses mensuelles de toutes les espèces
         data = db.session.query(
-            func.date_trunc('month', Observation.observed_at).label('month'),
-            func.count(Observation.id).label('count')
-        ).group_by('month').order_by('month').all()
+            SpeciesMonthlyCount.month,
+            func.sum(SpeciesMonthlyCount.count).label('count')
+        ).group_by(SpeciesMonthlyCount.month).order_by(SpeciesMonthlyCount.month).all()
         
-        print(f"Found {len(data)} monthly records")
+        log.debug("Timeline stats: %d months", len(data))
         
         result = []
         for month, count in data:
@@ -70,11 +134,8 @@ def timeline():
                 'count': count
             })
         
-        print(f"Returning {len(result)} timeline records")
         return jsonify(result), 200
         
     except Exception as e:
-        print(f"❌ Error in timeline stats: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("Error in timeline stats")
         return jsonify({'msg': 'Erreur lors de la récupération des statistiques temporelles', 'error': str(e)}), 500
\ No newline at end of file
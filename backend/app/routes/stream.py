@@ -0,0 +1,74 @@
+import json
+from flask import Blueprint, Response, jsonify, current_app, request
+from flask_jwt_extended import (
+    create_access_token, get_jwt, get_jwt_identity, get_jwt_request_location, jwt_required
+)
+from app import jwt
+
+stream_bp = Blueprint('stream', __name__)
+
+# Portée des jetons courts délivrés pour EventSource
+STREAM_SCOPE = 'stream'
+
+@jwt.token_verification_loader
+def _check_scope(jwt_header, jwt_data):
+    """Un jeton de flux n'ouvre que le flux (ni l'API, ni un nouveau jeton)"""
+    return jwt_data.get('scope') != STREAM_SCOPE or request.endpoint == 'stream.stream'
+
+def _format_event(event):
+    data = json.dumps(event['data'], default=str)
+    return f"id: {event['id']}\nevent: {event['event']}\ndata: {data}\n\n"
+
+def _event_stream(broker, subscription, heartbeat):
+    try:
+        # Délai de reconnexion conseillé au navigateur (ms)
+        yield 'retry: 5000\n\n'
+        while True:
+            event = subscription.get(timeout=heartbeat)
+            if event is None:
+                # Commentaire SSE : garde la connexion ouverte derrière les proxys
+                yield ': ping\n\n'
+                continue
+            yield _format_event(event)
+    finally:
+        broker.unsubscribe(subscription)
+
+@stream_bp.route('/token', methods=['POST'])
+@jwt_required()
+def stream_token():
+    """Jeton court réservé au flux, à passer en ``?jwt=`` à /api/stream
+
+    Une URL peut finir dans des journaux ou l'historique : le jeton de
+    session n'y est jamais placé.
+    """
+    expires = current_app.config['STREAM_TOKEN_EXPIRES']
+    token = create_access_token(identity=get_jwt_identity(), expires_delta=expires,
+                                additional_claims={'scope': STREAM_SCOPE})
+    return jsonify({'token': token, 'expires_in': int(expires.total_seconds())}), 200
+
+@stream_bp.route('', methods=['GET'])
+@jwt_required(locations=['headers', 'query_string'])
+def stream():
+    """Flux Server-Sent Events des nouvelles observations et des compteurs
+
+    EventSource ne pouvant pas envoyer d'en-têtes, un jeton obtenu via
+    /api/stream/token est accepté en paramètre ``?jwt=`` (le jeton de
+    session reste limité à l'en-tête). Le jeton n'est vérifié qu'à
+    l'ouverture : la connexion survit à son expiration. Les événements
+    manqués pendant une déconnexion se récupèrent via /api/sync.
+    """
+    if get_jwt_request_location() == 'query_string' and get_jwt().get('scope') != STREAM_SCOPE:
+        return jsonify({'msg': 'Jeton de flux requis en paramètre (POST /api/stream/token)'}), 401
+    broker = current_app.extensions['event_broker']
+    if broker.subscriber_count() >= current_app.config['STREAM_MAX_SUBSCRIBERS']:
+        return jsonify({'msg': 'Trop de connexions au flux, réessayez plus tard'}), 503
+    
+    subscription = broker.subscribe()
+    response = Response(
+        _event_stream(broker, subscription, current_app.config['STREAM_HEARTBEAT']),
+        mimetype='text/event-stream'
+    )
+    response.headers['Cache-Control'] = 'no-cache'
+    # Désactiver la mise en tampon de nginx
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
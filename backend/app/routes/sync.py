@@ -0,0 +1,35 @@
+import logging
+from flask import Blueprint, request, jsonify, current_app
+from flask_jwt_extended import jwt_required
+from app.sync import changes_since, current_token
+
+sync_bp = Blueprint('sync', __name__)
+log = logging.getLogger(__name__)
+
+@sync_bp.route('', methods=['GET'])
+@jwt_required()
+def sync():
+    """Synchronisation incrémentale des espèces, observations et plans
+
+    Sans ``since``, renvoie seulement le jeton courant : le client le
+    conserve avant son chargement initial des listes, puis rappelle avec
+    ``?since=<jeton>`` pour ne recevoir que les écritures suivantes.
+    """
+    try:
+        since = request.args.get('since')
+        if since is None:
+            return jsonify({'token': str(current_token()), 'has_more': False}), 200
+        
+        try:
+            since = int(since)
+            if since < 0:
+                raise ValueError
+        except ValueError:
+            return jsonify({'msg': 'Jeton de synchronisation invalide'}), 400
+        
+        token, has_more, changes = changes_since(since, current_app.config['SYNC_MAX_CHANGES'])
+        return jsonify({'token': str(token), 'has_more': has_more, **changes}), 200
+        
+    except Exception:
+        log.exception("Error in sync")
+        return jsonify({'msg': 'Erreur lors de la synchronisation'}), 500
@@ -0,0 +1,112 @@
+import dataclasses
+import decimal
+import uuid
+from datetime import date, datetime
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy.engine import Row
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(obj):
+    """Types non natifs : dates ISO 8601, lignes SQL, décimaux..."""
+    if isinstance(obj, Row):
+        return obj._asdict()
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, (decimal.Decimal, uuid.UUID)):
+        return str(obj)
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    if hasattr(obj, '__html__'):
+        return str(obj.__html__())
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+def rows_as_objects(rows):
+    """Lignes SQL (``Row``) -> dicts, noms de colonnes lus une seule fois
+
+    Construit chaque objet directement depuis le tuple de la ligne, sans
+    ``Row._asdict()`` ni appel de ``default`` par ligne. orjson n'encodant
+    un objet JSON qu'à partir d'un dict, un dict par ligne reste nécessaire.
+    """
+    fields = None
+    for row in rows:
+        if fields is None:
+            fields = row._fields
+        yield dict(zip(fields, row))
+
+
+def _prepare(obj):
+    # Liste de lignes SQL (réponses de liste) : conversion groupée
+    if isinstance(obj, list) and obj and isinstance(obj[0], Row):
+        return list(rows_as_objects(obj))
+    return obj
+
+
+class JSONProvider(DefaultJSONProvider):
+    """Sérialisation par la bibliothèque standard
+
+    Les dates sont écrites en ISO 8601 (comme les ``to_dict`` des modèles)
+    et les lignes SQL (``Row``) directement comme des objets : une liste
+    peut être renvoyée sans instancier d'objets ORM.
+    """
+
+    default = staticmethod(_default)
+    ensure_ascii = False
+    sort_keys = False
+
+    def dumps(self, obj, **kwargs):
+        return super().dumps(_prepare(obj), **kwargs)
+
+
+class OrjsonProvider(JSONProvider):
+    """Sérialisation par orjson (dépendance optionnelle), même format de sortie"""
+
+    options = orjson.OPT_NON_STR_KEYS if orjson else 0
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(_prepare(obj), default=_default, option=self.options).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = _prepare(self._prepare_response_obj(args, kwargs))
+        options = self.options | orjson.OPT_APPEND_NEWLINE
+        if self.compact is False or (self.compact is None and self._app.debug):
+            options |= orjson.OPT_INDENT_2
+        # Corps en octets, sans passer par une chaîne intermédiaire
+        return self._app.response_class(orjson.dumps(obj, default=_default, option=options),
+                                        mimetype=self.mimetype)
+
+
+def parse_fields(args, fields, default):
+    """Colonnes à sélectionner d'après ``?fields=a,b`` (``id`` toujours inclus)
+
+    ``fields`` associe chaque nom exposé à une expression SQL. Lève
+    ValueError avec un message destiné au client si un champ est inconnu.
+    """
+    if args.get('fields'):
+        names = [name.strip() for name in args['fields'].split(',') if name.strip()]
+        unknown = [name for name in names if name not in fields]
+        if unknown:
+            raise ValueError(f"Champs inconnus: {', '.join(unknown)}")
+    else:
+        names = default
+    names = dict.fromkeys(['id', *names])
+    return [fields[name].label(name) for name in names]
+
+
+def init_json(app):
+    """Choisir le sérialiseur JSON : orjson s'il est installé, sinon la bibliothèque standard"""
+    serializer = app.config['JSON_SERIALIZER']
+    if serializer == 'orjson' and orjson is None:
+        raise RuntimeError('JSON_SERIALIZER=orjson nécessite le paquet orjson')
+    if serializer == 'orjson' or (serializer == 'auto' and orjson is not None):
+        app.json = OrjsonProvider(app)
+    else:
+        app.json = JSONProvider(app)
@@ -0,0 +1,45 @@
+from sqlalchemy.dialects import postgresql, sqlite
+from app import db
+
+
+def dialect_insert(model):
+    """INSERT propre au SGBD courant (supporte ON CONFLICT sur PostgreSQL et SQLite)"""
+    if db.session.get_bind().dialect.name == 'sqlite':
+        return sqlite.insert(model.__table__)
+    return postgresql.insert(model.__table__)
+
+
+def chunked(items, size):
+    """Découper une séquence en lots de taille fixe"""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def insert_many(model, records, chunk_size=1000):
+    """Insérer des lignes par lots (INSERT multi-valeurs) et retourner leurs ids
+
+    Sans gestion des conflits : pour une table à clé unique, voir insert_new.
+    """
+    ids = []
+    for chunk in chunked(records, chunk_size):
+        statement = model.__table__.insert().values(chunk).returning(model.__table__.c.id)
+        ids.extend(db.session.execute(statement).scalars())
+    return ids
+
+
+def insert_new(model, records, key, chunk_size=1000):
+    """Insérer par lots les lignes dont la clé unique ``key`` est absente
+
+    INSERT ... ON CONFLICT (key) DO NOTHING : une ligne insérée entre-temps
+    par une autre transaction est ignorée au lieu de lever IntegrityError.
+    Retourne {clé: id} des seules lignes insérées ; les autres sont des
+    doublons.
+    """
+    table = model.__table__
+    inserted = {}
+    for chunk in chunked(records, chunk_size):
+        statement = dialect_insert(model).values(chunk).on_conflict_do_nothing(
+            index_elements=[key]
+        ).returning(table.c[key], table.c.id)
+        inserted.update(db.session.execute(statement).all())
+    return inserted
@@ -0,0 +1,61 @@
+from sqlalchemy import func
+from app import db
+from app.models import ChangeLog, TRACKED_ENTITIES, pending_changes
+from app.sqlutils import chunked
+
+LOOKUP_CHUNK_SIZE = 1000
+
+# Entités renvoyées par /api/sync : nom -> modèle
+SYNC_ENTITIES = {entity: model for model, entity in TRACKED_ENTITIES.items()}
+
+
+def record_changes(entity, ids):
+    """Journaliser des lignes écrites hors de l'ORM (insertions en masse)
+
+    Le journal est écrit au commit de la session (voir ChangeLog).
+    """
+    pending_changes(db.session).extend({'entity': entity, 'entity_id': entity_id} for entity_id in ids)
+
+
+def current_token():
+    """Jeton courant : id de la dernière écriture journalisée
+
+    Les ids étant attribués dans l'ordre des commits, toute écriture non
+    encore validée recevra un id supérieur.
+    """
+    return db.session.query(func.max(ChangeLog.id)).scalar() or 0
+
+
+def changes_since(since, limit):
+    """Lignes créées, modifiées ou supprimées après le jeton ``since``
+
+    Au plus ``limit`` écritures du journal sont lues ; ``has_more`` indique
+    qu'il faut rappeler avec le nouveau jeton. Une ligne modifiée plusieurs
+    fois n'est renvoyée qu'une fois, dans son état actuel ; une ligne
+    absente de la table est signalée supprimée.
+    """
+    entries = db.session.query(ChangeLog.id, ChangeLog.entity, ChangeLog.entity_id).filter(
+        ChangeLog.id > since
+    ).order_by(ChangeLog.id).limit(limit + 1).all()
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+
+    changed = {entity: set() for entity in SYNC_ENTITIES}
+    for entry in entries:
+        if entry.entity in changed:
+            changed[entry.entity].add(entry.entity_id)
+
+    result = {}
+    for entity, model in SYNC_ENTITIES.items():
+        ids = sorted(changed[entity])
+        rows = []
+        for chunk in chunked(ids, LOOKUP_CHUNK_SIZE):
+            rows.extend(model.query.filter(model.id.in_(chunk)).order_by(model.id).all())
+        present = {row.id for row in rows}
+        result[entity] = {
+            'upserted': [row.to_dict() for row in rows],
+            'deleted': [entity_id for entity_id in ids if entity_id not in present]
+        }
+
+    token = entries[-1].id if entries else since
+    return token, has_more, result
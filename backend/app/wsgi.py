@@ -0,0 +1,7 @@
+"""Point d'entrée des serveurs WSGI de production (ex. ``gunicorn app.wsgi:app``)
+
+Le schéma n'est pas créé ici : lancer ``flask init-db`` au déploiement.
+"""
+from app.main import create_app
+
+app = create_app()
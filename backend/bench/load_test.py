@@ -0,0 +1,153 @@
+"""Test de charge HTTP : débit et latences d'un endpoint GET
+
+Contre un serveur déjà lancé :
+
+    python bench/load_test.py --url http://localhost:5000/api/species \
+        --username admin --password secret
+
+Pour mesurer le passage à l'échelle, --workers lance gunicorn localement
+avec chaque nombre de workers et compare les débits (plusieurs workers
+exigent CACHE_BACKEND=redis et EVENT_BROKER=postgres, voir gunicorn.conf.py) :
+
+    python bench/load_test.py --path /api/species --workers 1,2,4,8 \
+        --username admin --password secret
+
+Le client n'utilise que la bibliothèque standard ; les requêtes sont
+réparties sur plusieurs processus pour ne pas être limitées par le GIL.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def login(base_url, username, password):
+    request = urllib.request.Request(
+        f'{base_url}/api/auth/login',
+        data=json.dumps({'username': username, 'password': password}).encode(),
+        headers={'Content-Type': 'application/json'}
+    )
+    with urllib.request.urlopen(request) as response:
+        return json.load(response)['access_token']
+
+
+def _client(url, token, requests, threads):
+    """Processus client : ``requests`` requêtes réparties sur ``threads`` threads"""
+    headers = {'Authorization': f'Bearer {token}'} if token else {}
+
+    def call(_):
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(urllib.request.Request(url, headers=headers)) as response:
+                response.read()
+                ok = response.status == 200
+        except Exception:
+            ok = False
+        return time.perf_counter() - start, ok
+
+    with ThreadPoolExecutor(threads) as executor:
+        return list(executor.map(call, range(requests)))
+
+
+def run_load(url, token, requests, concurrency, processes):
+    """Lancer la charge et retourner un résumé (débit, percentiles, erreurs)"""
+    processes = max(1, min(processes, concurrency))
+    per_process = [requests // processes + (i < requests % processes) for i in range(processes)]
+    threads = max(1, concurrency // processes)
+
+    start = time.perf_counter()
+    with multiprocessing.Pool(processes) as pool:
+        batches = pool.starmap(_client, [(url, token, n, threads) for n in per_process])
+    elapsed = time.perf_counter() - start
+
+    results = [result for batch in batches for result in batch]
+    latencies = sorted(latency for latency, _ in results)
+
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+
+    return {
+        'requests': len(results),
+        'errors': sum(1 for _, ok in results if not ok),
+        'seconds': round(elapsed, 2),
+        'rps': round(len(results) / elapsed, 1),
+        'p50_ms': round(percentile(0.50), 1),
+        'p95_ms': round(percentile(0.95), 1),
+        'p99_ms': round(percentile(0.99), 1)
+    }
+
+
+def _wait_until_up(base_url, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(f'{base_url}/health'):
+                return
+        except Exception:
+            time.sleep(0.5)
+    raise RuntimeError('Le serveur ne répond pas')
+
+
+def scaling(args):
+    """Comparer le débit de gunicorn pour plusieurs nombres de workers"""
+    base_url = f'http://127.0.0.1:{args.port}'
+    rows = []
+    for workers in [int(w) for w in args.workers.split(',')]:
+        env = dict(os.environ, GUNICORN_WORKERS=str(workers), PORT=str(args.port))
+        server = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py',
+             '--access-logfile', '/dev/null', 'app.wsgi:app'],
+            cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            _wait_until_up(base_url)
+            token = args.token or login(base_url, args.username, args.password)
+            url = base_url + args.path
+            # Échauffement : connexions du pool et caches des workers
+            run_load(url, token, min(200, args.requests), args.concurrency, args.processes)
+            result = run_load(url, token, args.requests, args.concurrency, args.processes)
+        finally:
+            server.terminate()
+            server.wait()
+        rows.append((workers, result))
+        print(f"workers={workers:<3} {result['rps']:>8} req/s  p50={result['p50_ms']} ms  "
+              f"p95={result['p95_ms']} ms  erreurs={result['errors']}")
+
+    baseline = rows[0][1]['rps']
+    for workers, result in rows:
+        print(f"workers={workers:<3} accélération x{result['rps'] / baseline:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', help='URL complète à charger (serveur déjà lancé)')
+    parser.add_argument('--path', default='/api/species', help='Chemin chargé avec --workers')
+    parser.add_argument('--workers', help='Nombres de workers gunicorn à comparer, ex. 1,2,4')
+    parser.add_argument('--port', type=int, default=5055)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--processes', type=int, default=multiprocessing.cpu_count())
+    parser.add_argument('--token')
+    parser.add_argument('--username')
+    parser.add_argument('--password')
+    args = parser.parse_args()
+
+    if args.workers:
+        scaling(args)
+        return
+    if not args.url:
+        parser.error('--url ou --workers requis')
+    base_url = args.url.split('/api/')[0]
+    token = args.token or (login(base_url, args.username, args.password) if args.username else None)
+    print(json.dumps(run_load(args.url, token, args.requests, args.concurrency, args.processes), indent=2))
+
+
+if __name__ == '__main__':
+    main()
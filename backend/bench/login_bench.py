@@ -0,0 +1,119 @@
+"""Banc de connexion : débit de /api/auth/login et coût du hachage par cœur
+
+Contre un serveur déjà lancé (compte existant) :
+
+    python bench/login_bench.py --url http://localhost:5000 \
+        --username ranger --password secret --server-cores 4
+
+Coût du hachage seul, pour choisir PASSWORD_HASH_METHOD :
+
+    python bench/login_bench.py --kdf pbkdf2:sha256:260000,pbkdf2:sha256:600000
+
+Le débit HTTP est ramené au nombre de cœurs du serveur (--server-cores,
+par défaut ceux de la machine locale) ; les réponses 503 signalent des
+connexions refusées par la file de vérification.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+def _client(base_url, username, password, requests, threads):
+    """Processus client : ``requests`` connexions réparties sur ``threads`` threads"""
+    body = json.dumps({'username': username, 'password': password}).encode()
+
+    def call(_):
+        request = urllib.request.Request(f'{base_url}/api/auth/login', data=body,
+                                         headers={'Content-Type': 'application/json'})
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request) as response:
+                response.read()
+                status = response.status
+        except urllib.error.HTTPError as e:
+            status = e.code
+        except Exception:
+            status = None
+        return time.perf_counter() - start, status
+
+    with ThreadPoolExecutor(threads) as executor:
+        return list(executor.map(call, range(requests)))
+
+
+def run_logins(args):
+    processes = max(1, min(args.processes, args.concurrency))
+    per_process = [args.requests // processes + (i < args.requests % processes) for i in range(processes)]
+    threads = max(1, args.concurrency // processes)
+
+    start = time.perf_counter()
+    with multiprocessing.Pool(processes) as pool:
+        batches = pool.starmap(_client, [
+            (args.url, args.username, args.password, n, threads) for n in per_process
+        ])
+    elapsed = time.perf_counter() - start
+
+    results = [result for batch in batches for result in batch]
+    latencies = sorted(latency for latency, status in results if status == 200)
+    succeeded = len(latencies)
+
+    def percentile(p):
+        return round(latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000, 1) if latencies else None
+
+    return {
+        'requests': len(results),
+        'logins': succeeded,
+        'rejected_503': sum(1 for _, status in results if status == 503),
+        'errors': sum(1 for _, status in results if status not in (200, 503)),
+        'seconds': round(elapsed, 2),
+        'logins_per_s': round(succeeded / elapsed, 1),
+        'logins_per_s_per_core': round(succeeded / elapsed / args.server_cores, 1),
+        'p50_ms': percentile(0.50),
+        'p95_ms': percentile(0.95),
+        'p99_ms': percentile(0.99)
+    }
+
+
+def kdf_cost(methods, seconds):
+    """Vérifications par seconde sur un cœur pour chaque méthode de hachage"""
+    from werkzeug.security import check_password_hash, generate_password_hash
+
+    for method in methods:
+        password_hash = generate_password_hash('benchmark-password', method)
+        count = 0
+        start = time.perf_counter()
+        while time.perf_counter() - start < seconds:
+            check_password_hash(password_hash, 'benchmark-password')
+            count += 1
+        elapsed = time.perf_counter() - start
+        print(f'{method:<28} {count / elapsed:>8.1f} vérifications/s/cœur  '
+              f'{elapsed / count * 1000:>7.1f} ms')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', help='URL de base du serveur (ex. http://localhost:5000)')
+    parser.add_argument('--username')
+    parser.add_argument('--password')
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--processes', type=int, default=multiprocessing.cpu_count())
+    parser.add_argument('--server-cores', type=int, default=os.cpu_count())
+    parser.add_argument('--kdf', help='Méthodes werkzeug à comparer, séparées par des virgules')
+    parser.add_argument('--seconds', type=float, default=3, help='Durée de mesure par méthode (--kdf)')
+    args = parser.parse_args()
+
+    if args.kdf:
+        kdf_cost(args.kdf.split(','), args.seconds)
+        return
+    if not (args.url and args.username and args.password):
+        parser.error('--url, --username et --password requis (ou --kdf)')
+    print(json.dumps(run_logins(args), indent=2))
+
+
+if __name__ == '__main__':
+    main()
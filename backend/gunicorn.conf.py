@@ -0,0 +1,109 @@
+"""Configuration gunicorn du serveur de production
+
+    gunicorn -c gunicorn.conf.py app.wsgi:app
+
+Réglages par variables d'environnement : GUNICORN_WORKERS (défaut
+2 x CPU + 1 avec des backends partagés, sinon 1), GUNICORN_WORKER_CLASS
+(gthread ou gevent), GUNICORN_THREADS, GUNICORN_TIMEOUT,
+GUNICORN_GRACEFUL_TIMEOUT, GUNICORN_MAX_REQUESTS (0 par défaut), PORT.
+
+Plusieurs workers exigent des backends partagés : CACHE_BACKEND=redis
+(sinon chaque worker sert son propre cache, invalidé par ses seules
+écritures) et EVENT_BROKER=postgres (sinon /api/stream ne reçoit que les
+écritures du worker connecté). Le serveur refuse de démarrer sinon.
+"""
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+# Compteurs Prometheus partagés entre workers : le dossier doit être défini
+# avant le premier import de prometheus_client (chargement de l'application)
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'prometheus'))
+
+
+def _local_backends():
+    """Réglages à changer pour que l'état partagé soit commun à tous les workers"""
+    required = []
+    if os.getenv('CACHE_BACKEND', 'local') != 'redis':
+        required.append('CACHE_BACKEND=redis')
+    if os.getenv('EVENT_BROKER', 'local') != 'postgres':
+        required.append('EVENT_BROKER=postgres')
+    return required
+
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+workers = int(os.getenv('GUNICORN_WORKERS', 1 if _local_backends() else multiprocessing.cpu_count() * 2 + 1))
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+# Threads par worker (gthread) ; les connexions SSE occupent chacune un thread,
+# d'où STREAM_MAX_SUBSCRIBERS = threads / 2 par défaut
+threads = int(os.getenv('GUNICORN_THREADS', 8))
+# Connexions simultanées par worker (gevent)
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', 1000))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 60))
+# Délai accordé à un worker arrêté pour finir ses requêtes et ses imports en cours
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = 5
+# Recyclage des workers désactivé par défaut : les imports asynchrones
+# tournent dans le worker, et un recyclage (sondes /ready et suivi des
+# imports compris dans le compte) les interromprait à mi-fichier. À
+# n'activer (ex. 2000) qu'avec un graceful_timeout couvrant les imports.
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 0))
+max_requests_jitter = 200 if max_requests else 0
+accesslog = '-'
+# Chemin sans la chaîne de requête (%(U)s au lieu de %(r)s) : /api/stream
+# reçoit son jeton en ?jwt=, qui ne doit pas finir dans les journaux
+access_log_format = '%(h)s %(l)s %(u)s %(t)s "%(m)s %(U)s %(H)s" %(s)s %(b)s "%(f)s" "%(a)s"'
+
+# L'application est chargée une fois dans le maître puis partagée par fork,
+# sauf avec gevent qui doit patcher la bibliothèque standard avant tout import
+preload_app = worker_class != 'gevent'
+
+
+def on_starting(server):
+    """Refuser une configuration qui bloquerait les workers ; repartir de compteurs vides"""
+    required = _local_backends()
+    if workers > 1 and required:
+        raise RuntimeError(f"{workers} workers nécessitent des backends partagés : {', '.join(required)}")
+    # Avec gthread, chaque connexion SSE garde un thread : il en faut pour le reste de l'API
+    max_subscribers = os.getenv('STREAM_MAX_SUBSCRIBERS')
+    if worker_class == 'gthread' and max_subscribers and int(max_subscribers) >= threads:
+        raise RuntimeError(f'STREAM_MAX_SUBSCRIBERS={max_subscribers} doit rester inférieur à '
+                           f'GUNICORN_THREADS={threads} (ou utiliser GUNICORN_WORKER_CLASS=gevent)')
+    directory = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory)
+
+
+def child_exit(server, worker):
+    """Retirer les jauges du worker arrêté (les compteurs restent cumulés)"""
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
+
+
+def worker_exit(server, worker):
+    """Laisser finir les imports en cours ; marquer en échec ceux qui ne finissent pas à temps"""
+    from app.wsgi import app
+    jobs = app.extensions.get('import_jobs')
+    if jobs is None:
+        return
+    # Marge avant l'arrêt forcé du worker par l'arbitre
+    interrupted = jobs.shutdown(max(0, graceful_timeout - 5))
+    if interrupted:
+        server.log.warning('Imports interrompus par l\'arrêt du worker : %s', ', '.join(interrupted))
+
+
+def post_fork(server, worker):
+    """Ne pas réutiliser dans le worker les connexions ouvertes par le maître"""
+    if worker_class == 'gevent':
+        try:
+            # Attente coopérative des requêtes psycopg2 (dépendance optionnelle)
+            from psycogreen.gevent import patch_psycopg
+            patch_psycopg()
+        except ImportError:
+            server.log.warning('psycogreen absent : les requêtes SQL bloqueront la boucle gevent')
+    if preload_app:
+        from app import db
+        from app.wsgi import app
+        with app.app_context():
+            db.engine.dispose(close=False)
@@ -0,0 +1,63 @@
+"""Fixtures des tests du backend
+
+    pip install -r requirements-dev.txt
+    python -m pytest tests
+
+Base SQLite temporaire par défaut ; TEST_DATABASE_URL désigne une base
+PostgreSQL de test (vidée à chaque test) pour les cas qui en dépendent.
+"""
+import os
+import tempfile
+
+import pytest
+
+_tmpdir = tempfile.mkdtemp(prefix='species-tests-')
+os.environ['DATABASE_URL'] = os.getenv('TEST_DATABASE_URL') or f'sqlite:///{_tmpdir}/test.db'
+os.environ.setdefault('JWT_SECRET_KEY', 'test-jwt-secret-key-long-enough-for-hs256')
+os.environ.setdefault('IMPORT_SPOOL_DIR', os.path.join(_tmpdir, 'spool'))
+
+from flask_jwt_extended import create_access_token  # noqa: E402
+from app import db  # noqa: E402
+from app.cache import LocalSharedBackend, init_cache  # noqa: E402
+from app.main import create_app  # noqa: E402
+from app.models import User  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def app():
+    app = create_app()
+    app.config['TESTING'] = True
+    return app
+
+
+@pytest.fixture(autouse=True)
+def database(app):
+    # Cache de réponses vide, à valeurs sérialisées comme avec Redis
+    init_cache(app, LocalSharedBackend(app.config['CACHE_MAX_ENTRIES']))
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        yield db
+        db.session.remove()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def auth_headers(database):
+    user = User(username='ranger', role='admin')
+    user.set_password('secret1')
+    db.session.add(user)
+    db.session.commit()
+    return {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}
+
+
+def postgresql_only(test):
+    """Cas qui nécessitent PostgreSQL (transactions concurrentes)"""
+    return pytest.mark.skipif(
+        not os.environ['DATABASE_URL'].startswith('postgresql'),
+        reason='TEST_DATABASE_URL PostgreSQL non défini'
+    )(test)
@@ -0,0 +1,53 @@
+import io
+from app.cache import LocalSharedBackend, init_cache
+
+
+def _species_list(client, auth_headers, etag=None):
+    headers = dict(auth_headers, **({'If-None-Match': etag} if etag else {}))
+    return client.get('/api/species', headers=headers)
+
+
+def _add_species(client, auth_headers, name):
+    response = client.post('/api/species', headers=auth_headers,
+                           json={'common_name': name, 'scientific_name': f'{name} testus'})
+    assert response.status_code == 201
+
+
+def test_unchanged_response_is_revalidated_with_304(client, auth_headers):
+    first = _species_list(client, auth_headers)
+    assert first.status_code == 200 and first.headers['ETag']
+
+    second = _species_list(client, auth_headers, first.headers['ETag'])
+    assert second.status_code == 304
+
+
+def test_post_invalidates_cached_response(client, auth_headers):
+    first = _species_list(client, auth_headers)
+    _add_species(client, auth_headers, 'Lynx')
+
+    second = _species_list(client, auth_headers, first.headers['ETag'])
+    assert second.status_code == 200
+    assert second.headers['ETag'] != first.headers['ETag']
+    assert [s['common_name'] for s in second.json] == ['Lynx']
+
+
+def test_import_invalidates_cached_response(client, auth_headers):
+    first = _species_list(client, auth_headers)
+    upload = (io.BytesIO(b'common_name,scientific_name\nLoup,Canis lupus\n'), 'species.csv')
+    response = client.post('/api/import/import', headers=auth_headers, data={'file': upload},
+                           content_type='multipart/form-data')
+    assert response.status_code == 201
+
+    second = _species_list(client, auth_headers, first.headers['ETag'])
+    assert second.status_code == 200
+    assert [s['common_name'] for s in second.json] == ['Loup']
+
+
+def test_evicted_entries_never_bring_back_stale_responses(app, client, auth_headers):
+    # Cache minuscule : chaque requête évince les autres entrées
+    init_cache(app, LocalSharedBackend(max_entries=1))
+    for index in range(5):
+        _species_list(client, auth_headers)
+        client.get(f'/api/species?page={index}', headers=auth_headers)
+        _add_species(client, auth_headers, f'Espece{index}')
+        assert len(_species_list(client, auth_headers).json) == index + 1
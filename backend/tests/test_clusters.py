@@ -0,0 +1,34 @@
+import random
+from app import db, geo
+from app.models import Observation, Species
+
+
+def _random_observations(count):
+    species = Species(common_name='Lynx', scientific_name='Lynx lynx')
+    db.session.add(species)
+    db.session.flush()
+    rng = random.Random(42)
+    db.session.add_all([
+        Observation(species_id=species.id, latitude=rng.uniform(-90, 90), longitude=rng.uniform(-180, 180))
+        for _ in range(count)
+    ])
+    db.session.commit()
+
+
+def test_cluster_count_is_bounded_at_high_zoom(client, auth_headers):
+    _random_observations(3000)
+    for query in ('bbox=-180,-90,180,90&zoom=22', 'zoom=22', 'bbox=-180,-90,180,90&zoom=10', ''):
+        response = client.get(f'/api/observations/clusters?{query}', headers=auth_headers)
+        assert response.status_code == 200
+        clusters = response.json['clusters']
+        assert len(clusters) <= geo.MAX_CLUSTER_CELLS, query
+        assert sum(c['count'] for c in clusters) == 3000
+
+
+def test_small_bbox_keeps_zoom_precision(client, auth_headers):
+    db.session.add(Species(id=1, common_name='Lynx', scientific_name='Lynx lynx'))
+    db.session.add(Observation(species_id=1, latitude=45.5, longitude=6.25))
+    db.session.commit()
+    response = client.get('/api/observations/clusters?bbox=6.2,45.4,6.3,45.6&zoom=14',
+                          headers=auth_headers)
+    assert [len(c['cell']) for c in response.json['clusters']] == [geo.zoom_to_precision(14)]
@@ -0,0 +1,56 @@
+import uuid
+import pytest
+from app import db
+from app.events import LocalEventBroker, NOTIFY_MAX_BYTES, init_events, notify_payload
+from app.models import Species
+
+
+class NotifyBroker(LocalEventBroker):
+    """Broker local soumis à la même limite de taille que PostgresEventBroker"""
+
+    def __init__(self):
+        super().__init__()
+        self.published = []
+
+    def publish(self, name, data):
+        payload = notify_payload(name, data)
+        self.published.append((name, data, len(payload.encode())))
+        super().publish(name, data)
+
+
+@pytest.fixture
+def broker(app):
+    broker = NotifyBroker()
+    previous = app.extensions['event_broker']
+    init_events(app, broker)
+    yield broker
+    app.extensions['event_broker'] = previous
+
+
+def test_notify_payload_rejects_oversized_events():
+    with pytest.raises(ValueError):
+        notify_payload('observations', {'notes': 'x' * NOTIFY_MAX_BYTES})
+
+
+def test_batch_events_fit_in_notify(client, auth_headers, broker):
+    species = [Species(common_name=f'Espèce {i}', scientific_name=f'Species {i}') for i in range(250)]
+    db.session.add_all(species)
+    db.session.commit()
+    items = [{
+        'uuid': str(uuid.uuid4()), 'species_id': s.id, 'latitude': 45.123456, 'longitude': 6.123456,
+        'observed_at': '2024-05-01T10:00:00Z', 'notes': 'n' * 170
+    } for s in species]
+
+    response = client.post('/api/observations/batch', headers=auth_headers, json=items)
+    assert response.json['created'] == 250
+
+    # Charges complètes (lignes et notes) : plus de 8000 octets sans découpage
+    assert all(size <= NOTIFY_MAX_BYTES for _, _, size in broker.published)
+    events = {}
+    for name, data, _ in broker.published:
+        events.setdefault(name, []).append(data)
+    created_ids = [result['id'] for result in response.json['results']]
+    assert events['observations'] == [{'total': 250, 'ids': created_ids[:20]}]
+    counts = [c for data in events['stats'] for c in data['counts']]
+    assert sorted(c['species_id'] for c in counts) == sorted(s.id for s in species)
+    assert len(events['stats']) == 3
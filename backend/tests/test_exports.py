@@ -0,0 +1,68 @@
+import csv
+import io
+from datetime import date, datetime
+import pyarrow.parquet
+import pytest
+from openpyxl import load_workbook
+from app import db
+from app.models import ConservationPlan, Observation, Species
+
+
+def _read(fmt, data):
+    """En-tête et lignes d'un fichier exporté, en texte pour comparer les formats"""
+    if fmt == 'csv':
+        rows = list(csv.reader(io.StringIO(data.decode())))
+    elif fmt == 'xlsx':
+        sheet = load_workbook(io.BytesIO(data), read_only=True).active
+        rows = [list(row) for row in sheet.iter_rows(values_only=True)]
+    else:
+        table = pyarrow.parquet.read_table(io.BytesIO(data))
+        rows = [table.column_names] + [list(row.values()) for row in table.to_pylist()]
+    # Cellules vides en fin de ligne absentes des feuilles Excel
+    width = len(rows[0])
+    rows = [list(row) + [None] * (width - len(row)) for row in rows]
+    return rows[0], [[None if value in ('', None) else str(value) for value in row] for row in rows[1:]]
+
+
+@pytest.fixture
+def data(database):
+    species = Species(common_name='Lynx', scientific_name='Lynx lynx')
+    db.session.add(species)
+    db.session.flush()
+    db.session.add_all([
+        Observation(species_id=species.id, latitude=45.5, longitude=6.25,
+                    observed_at=datetime(2024, 5, 1, 10, 0), notes='Près du col'),
+        Observation(species_id=species.id, latitude=46.0, longitude=7.0,
+                    observed_at=datetime(2024, 5, 2, 8, 30)),
+    ])
+    db.session.add(ConservationPlan(
+        espece='Lynx', nom_scientifique='Lynx lynx', activite='Suivi', taches='Pièges photo',
+        responsable='Parc', date_debut_taches=date(2024, 1, 1), date_fin_taches=date(2024, 12, 31),
+        budget_annee_1=1000.0
+    ))
+    db.session.commit()
+
+
+@pytest.mark.parametrize('fmt', ['csv', 'xlsx', 'parquet'])
+def test_observation_export(client, auth_headers, data, fmt):
+    response = client.get(f'/api/observations/export?format={fmt}', headers=auth_headers)
+    assert response.status_code == 200
+    headers, rows = _read(fmt, response.data)
+    assert headers == ['id', 'uuid', 'species_id', 'latitude', 'longitude', 'observed_at', 'notes']
+    assert [float(row[3]) for row in rows] == [45.5, 46.0]
+    assert rows[0][6] == 'Près du col'
+    assert rows[1][6] is None
+
+
+@pytest.mark.parametrize('fmt', ['csv', 'xlsx', 'parquet'])
+def test_conservation_export(client, auth_headers, data, fmt):
+    response = client.get(f'/api/conservation/export?format={fmt}', headers=auth_headers)
+    assert response.status_code == 200
+    headers, rows = _read(fmt, response.data)
+    assert len(rows) == 1
+    assert {'Lynx', 'Lynx lynx', 'Pièges photo'} <= set(rows[0])
+
+
+def test_unknown_export_format_is_rejected(client, auth_headers):
+    response = client.get('/api/observations/export?format=pdf', headers=auth_headers)
+    assert response.status_code == 400
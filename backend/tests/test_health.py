@@ -0,0 +1,23 @@
+import threading
+from app import health
+
+
+def test_hung_database_check_is_not_queued_again(app, monkeypatch):
+    release = threading.Event()
+    calls = []
+
+    def hanging_select(engine, timeout):
+        calls.append(engine)
+        release.wait(5)
+
+    monkeypatch.setattr(health, '_select_one', hanging_select)
+    assert health.check_database(0.05)['status'] == 'down'
+    # Sondes suivantes : échec immédiat, sans nouvelle requête en file
+    for _ in range(5):
+        assert health.check_database(0.05)['error'] == 'vérification précédente toujours sans réponse'
+    assert len(calls) == 1
+
+    release.set()
+    health._in_flight.result(5)
+    monkeypatch.undo()
+    assert health.check_database(1)['status'] == 'ok'
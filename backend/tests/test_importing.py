@@ -0,0 +1,23 @@
+import pandas as pd
+from app import db, importing
+from app.models import Species
+
+
+def test_species_created_concurrently_is_reported_as_existing(monkeypatch):
+    db.session.add(Species(common_name='Lynx', scientific_name='Lynx lynx'))
+    db.session.commit()
+    # Import concurrent : le nom n'existait pas encore lors de la vérification
+    monkeypatch.setattr(importing, 'existing_scientific_names', lambda names: set())
+
+    frame = pd.DataFrame({
+        'common_name': ['Lynx boréal', 'Loup', ''],
+        'scientific_name': ['Lynx lynx', 'Canis lupus', 'Ursus arctos'],
+    })
+    result = importing.import_species_frame(frame, None)
+    db.session.commit()
+
+    assert result == {
+        'created': ['Loup'],
+        'skipped': ['Lynx lynx (existe déjà)', 'Ligne 4: nom commun ou scientifique manquant']
+    }
+    assert sorted(s.scientific_name for s in Species.query) == ['Canis lupus', 'Lynx lynx']
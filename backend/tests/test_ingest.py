@@ -0,0 +1,71 @@
+import json
+import uuid
+import pytest
+from app import db
+from app.models import Observation, Species
+
+
+@pytest.fixture
+def species(database):
+    species = Species(common_name='Lynx', scientific_name='Lynx lynx')
+    db.session.add(species)
+    db.session.commit()
+    return species
+
+
+def _observation(species_id, **fields):
+    return {'uuid': str(uuid.uuid4()), 'species_id': species_id, 'latitude': 45.0,
+            'longitude': 6.0, 'observed_at': '2024-05-01T10:00:00Z', **fields}
+
+
+def _send(client, auth_headers, items):
+    response = client.post('/api/observations/batch', headers=auth_headers, json=items)
+    assert response.status_code == 200
+    return response.json
+
+
+def test_batch_creates_and_reports_duplicates(client, auth_headers, species):
+    item = _observation(species.id)
+    assert _send(client, auth_headers, [item, item])['created'] == 1
+    result = _send(client, auth_headers, [item])
+    assert result['duplicates'] == 1
+    assert Observation.query.count() == 1
+
+
+def test_batch_rejects_numeric_observed_at(client, auth_headers, species):
+    result = _send(client, auth_headers, [
+        _observation(species.id, observed_at=1714550400),
+        _observation(species.id, observed_at='1714550400'),
+        _observation(species.id, observed_at='2024-05-01T12:00:00+02:00'),
+    ])
+    assert [item['status'] for item in result['results']] == ['invalid', 'invalid', 'created']
+    assert result['results'][0]['msg'] == 'Format de date invalide'
+    assert Observation.query.one().observed_at.isoformat() == '2024-05-01T10:00:00'
+
+
+def test_batch_rejects_boolean_species_id(client, auth_headers, species):
+    assert species.id == 1
+    result = _send(client, auth_headers, [
+        _observation(True),
+        _observation(species.id),
+    ])
+    assert [item['status'] for item in result['results']] == ['invalid', 'created']
+    assert result['results'][0]['msg'] == 'species_id invalide'
+
+
+def test_ndjson_batch_rejects_boolean_only_column(client, auth_headers, species):
+    body = '\n'.join(json.dumps(_observation(True)) for _ in range(2))
+    response = client.post('/api/observations/batch', headers=auth_headers, data=body,
+                           content_type='application/x-ndjson')
+    assert response.json['invalid'] == 2
+
+
+def test_batch_rejects_boolean_coordinates(client, auth_headers, species):
+    result = _send(client, auth_headers, [
+        _observation(species.id, latitude=True),
+        _observation(species.id, longitude=False),
+        _observation(species.id, latitude=0, longitude=1),
+    ])
+    assert [item['status'] for item in result['results']] == ['invalid', 'invalid', 'created']
+    assert result['results'][0]['msg'] == 'Valeurs numériques invalides'
+    assert Observation.query.count() == 1
@@ -0,0 +1,40 @@
+import io
+import threading
+from werkzeug.datastructures import FileStorage
+from app import db, jobs
+from app.jobs import ImportJobQueue, LocalBroker
+from app.models import ImportJob
+
+
+def _upload():
+    return FileStorage(io.BytesIO(b'common_name,scientific_name\nLynx,Lynx lynx\n'), filename='species.csv')
+
+
+def test_shutdown_marks_unfinished_imports_failed(app, monkeypatch):
+    started, release = threading.Event(), threading.Event()
+
+    def blocking_import(*args, **kwargs):
+        started.set()
+        release.wait(5)
+        return {'created': [], 'skipped': []}
+
+    monkeypatch.setattr(jobs, 'run_import', blocking_import)
+    queue = ImportJobQueue(app, LocalBroker(1))
+    running = queue.submit('species', _upload(), None)
+    queued = queue.submit('species', _upload(), None)
+    assert started.wait(5)
+
+    assert sorted(queue.shutdown(0.1)) == sorted([running, queued])
+    release.set()
+    assert queue.broker.shutdown(5)
+    db.session.expire_all()
+    job = db.session.get(ImportJob, queued)
+    assert job.status == 'failed'
+    assert 'arrêt du worker' in job.error
+
+
+def test_shutdown_waits_for_running_imports(app):
+    queue = ImportJobQueue(app, LocalBroker(1))
+    job_id = queue.submit('species', _upload(), None)
+    assert queue.shutdown(10) == []
+    assert db.session.get(ImportJob, job_id).status == 'done'
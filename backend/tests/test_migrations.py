@@ -0,0 +1,42 @@
+import pytest
+from sqlalchemy import text
+from app import db, geo
+from app.migrations import upgrade
+from app.models import ConservationPlan, Observation, Species, User
+
+
+@pytest.fixture
+def legacy_database(database):
+    """Base créée avant les migrations : observations sans geocell ni client_uuid"""
+    db.drop_all()
+    with db.engine.begin() as connection:
+        connection.execute(text('DROP TABLE IF EXISTS schema_migrations'))
+        for model in (User, Species, ConservationPlan):
+            model.__table__.create(connection)
+        connection.execute(text(
+            'CREATE TABLE observations (id INTEGER PRIMARY KEY, '
+            'species_id INTEGER REFERENCES species (id), latitude FLOAT, longitude FLOAT, '
+            'observed_at TIMESTAMP, notes TEXT)'
+        ))
+        connection.execute(text("INSERT INTO species (id, common_name, scientific_name) "
+                                "VALUES (1, 'Lynx', 'Lynx lynx')"))
+        connection.execute(text(
+            'INSERT INTO observations (id, species_id, latitude, longitude, observed_at) '
+            "VALUES (1, 1, 45.5, 6.25, '2024-05-01 10:00:00'), (2, 1, -12.0, 130.0, '2024-06-02 08:00:00')"
+        ))
+    return db
+
+
+def test_upgrade_backfills_geocells(legacy_database):
+    upgrade()
+    observations = Observation.query.order_by(Observation.id).all()
+    assert [o.geocell for o in observations] == [geo.encode(45.5, 6.25), geo.encode(-12.0, 130.0)]
+
+
+def test_upgrade_fills_rollups_from_existing_observations(legacy_database, client, auth_headers):
+    upgrade()
+    response = client.get('/api/stats/population', headers=auth_headers)
+    assert [(row['species_id'], row['count']) for row in response.json] == [(1, 2)]
+    response = client.get('/api/stats/timeline', headers=auth_headers)
+    assert response.status_code == 200
+    assert sum(row['count'] for row in response.json) == 2
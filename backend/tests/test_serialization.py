@@ -0,0 +1,52 @@
+import uuid
+from datetime import datetime
+import pytest
+from app import db
+from app.models import Observation, Species
+from app.serialization import JSONProvider, OrjsonProvider, orjson
+
+
+@pytest.fixture
+def observations(database):
+    species = Species(common_name='Lynx', scientific_name='Lynx lynx')
+    db.session.add(species)
+    db.session.flush()
+    db.session.add_all([
+        Observation(species_id=species.id, latitude=45.5, longitude=6.25,
+                    observed_at=datetime(2024, 5, 1, 10, 0), notes='Près du col'),
+        Observation(species_id=species.id, latitude=46.0, longitude=7.0,
+                    observed_at=datetime(2024, 5, 2, 8, 30)),
+    ])
+    db.session.commit()
+    return species
+
+
+@pytest.mark.parametrize('provider', [JSONProvider, pytest.param(
+    OrjsonProvider, marks=pytest.mark.skipif(orjson is None, reason='orjson non installé')
+)])
+def test_row_lists_encode_as_objects(app, observations, provider):
+    rows = db.session.query(Observation.id, Observation.observed_at, Observation.notes).order_by(Observation.id).all()
+    encoded = provider(app).loads(provider(app).dumps(rows))
+    assert encoded == [
+        {'id': rows[0].id, 'observed_at': '2024-05-01T10:00:00', 'notes': 'Près du col'},
+        {'id': rows[1].id, 'observed_at': '2024-05-02T08:30:00', 'notes': None},
+    ]
+
+
+def test_streamed_rows_match_list(client, auth_headers, observations):
+    listed = client.get('/api/observations?fields=latitude,notes', headers=auth_headers).json
+    streamed = client.get('/api/observations?fields=latitude,notes&stream=json', headers=auth_headers)
+    assert streamed.json == listed
+    assert listed[0] == {'id': listed[0]['id'], 'latitude': 45.5, 'notes': 'Près du col'}
+
+
+def test_totals(client, auth_headers):
+    species = Species(common_name='Lynx', scientific_name='Lynx lynx')
+    db.session.add_all([species, Species(common_name='Loup', scientific_name='Canis lupus')])
+    db.session.commit()
+    items = [{'uuid': str(uuid.uuid4()), 'species_id': species.id, 'latitude': 45.0, 'longitude': 6.0}
+             for _ in range(3)]
+    client.post('/api/observations/batch', headers=auth_headers, json=items)
+
+    response = client.get('/api/stats/totals', headers=auth_headers)
+    assert response.json == {'species': 2, 'observations': 3}
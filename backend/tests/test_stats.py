@@ -0,0 +1,25 @@
+from datetime import datetime
+from app import db
+from app.models import Observation, Species
+
+
+def _population(client, auth_headers, query):
+    response = client.get(f'/api/stats/population?{query}', headers=auth_headers)
+    assert response.status_code == 200
+    return {row['species_id']: row['count'] for row in response.json}
+
+
+def test_date_only_to_includes_the_whole_day(client, auth_headers):
+    species = Species(common_name='Lynx', scientific_name='Lynx lynx')
+    db.session.add(species)
+    db.session.flush()
+    for observed_at in (datetime(2024, 4, 30, 23, 0), datetime(2024, 5, 1, 0, 0),
+                        datetime(2024, 5, 1, 18, 30), datetime(2024, 5, 2, 0, 0)):
+        db.session.add(Observation(species_id=species.id, latitude=45.0, longitude=6.0,
+                                   observed_at=observed_at))
+    db.session.commit()
+
+    assert _population(client, auth_headers, 'to=2024-05-01') == {species.id: 3}
+    assert _population(client, auth_headers, 'from=2024-05-01&to=2024-05-01') == {species.id: 2}
+    # Heure explicite : borne incluse telle quelle
+    assert _population(client, auth_headers, 'to=2024-05-01T00:00:00') == {species.id: 2}
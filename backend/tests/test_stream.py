@@ -0,0 +1,26 @@
+def _stream_token(client, auth_headers):
+    response = client.post('/api/stream/token', headers=auth_headers)
+    assert response.status_code == 200
+    return response.json['token']
+
+
+def test_stream_accepts_scoped_token_in_query_string(client, auth_headers):
+    token = _stream_token(client, auth_headers)
+    response = client.get(f'/api/stream?jwt={token}')
+    try:
+        assert response.status_code == 200
+        assert response.mimetype == 'text/event-stream'
+    finally:
+        response.close()
+
+
+def test_stream_refuses_session_token_in_query_string(client, auth_headers):
+    session_token = auth_headers['Authorization'].split()[1]
+    assert client.get(f'/api/stream?jwt={session_token}').status_code == 401
+
+
+def test_stream_token_only_opens_the_stream(client, auth_headers):
+    token = _stream_token(client, auth_headers)
+    headers = {'Authorization': f'Bearer {token}'}
+    assert client.get('/api/species', headers=headers).status_code == 400
+    assert client.post('/api/stream/token', headers=headers).status_code == 400
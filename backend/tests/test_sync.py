@@ -0,0 +1,57 @@
+from app import db
+from app.models import ChangeLog, Species
+from app.sync import changes_since, current_token, record_changes
+from tests.conftest import postgresql_only
+
+
+def _species(name):
+    return Species(common_name=name, scientific_name=f'{name} testus')
+
+
+def test_change_log_written_at_commit():
+    species = _species('Lynx')
+    db.session.add(species)
+    db.session.flush()
+    assert db.session.query(ChangeLog).count() == 0
+
+    db.session.commit()
+    assert [(entry.entity, entry.entity_id) for entry in ChangeLog.query] == [('species', species.id)]
+
+
+def test_rolled_back_changes_are_not_logged():
+    db.session.add(_species('Loup'))
+    db.session.flush()
+    record_changes('species', [12345])
+    db.session.rollback()
+
+    kept = _species('Ours')
+    db.session.add(kept)
+    db.session.commit()
+    assert [entry.entity_id for entry in ChangeLog.query] == [kept.id]
+
+
+@postgresql_only
+def test_token_does_not_skip_transaction_committed_late():
+    # A écrit en premier mais valide après B : un client qui a reçu le jeton
+    # de B doit tout de même recevoir la ligne de A
+    first = db.session.session_factory()
+    second = db.session.session_factory()
+    try:
+        late = _species('Chamois')
+        first.add(late)
+        first.flush()
+
+        early = _species('Bouquetin')
+        second.add(early)
+        second.commit()
+
+        token = current_token()
+        db.session.commit()
+        first.commit()
+
+        _, _, changes = changes_since(token, 100)
+        assert [row['id'] for row in changes['species']['upserted']] == [late.id]
+        assert current_token() > token
+    finally:
+        first.close()
+        second.close()
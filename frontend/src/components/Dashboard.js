@@ -33,13 +33,12 @@ export default function Dashboard() {
         const timelineResponse = await axios.get(`${API_BASE_URL}/api/stats/timeline`, headers);
         setTimelineData(timelineResponse.data);
         
-        // Récupérer les statistiques générales
-        const speciesResponse = await axios.get(`${API_BASE_URL}/api/species`, headers);
-        const obsResponse = await axios.get(`${API_BASE_URL}/api/observations`, headers);
+        // Récupérer les statistiques générales (comptées côté serveur)
+        const totalsResponse = await axios.get(`${API_BASE_URL}/api/stats/totals`, headers);
         
         setStats({
-          totalSpecies: speciesResponse.data.length,
-          totalObservations: obsResponse.data.length
+          totalSpecies: totalsResponse.data.species,
+          totalObservations: totalsResponse.data.observations
         });
         
       } catch (error) {
@@ -57,6 +56,52 @@ export default function Dashboard() {
     fetchData();
   }, [headers]);
 
+  // Mises à jour en direct poussées par le serveur (Server-Sent Events)
+  useEffect(() => {
+    let source = null;
+    let retryTimer = null;
+    let closed = false;
+
+    // EventSource ne pouvant pas envoyer d'en-têtes, l'URL porte un jeton
+    // court réservé au flux, redemandé à chaque (re)connexion
+    const connect = async () => {
+      try {
+        const { data } = await axios.post(`${API_BASE_URL}/api/stream/token`, null, headers);
+        if (closed) return;
+        source = new EventSource(`${API_BASE_URL}/api/stream?jwt=${encodeURIComponent(data.token)}`);
+      } catch (error) {
+        if (!closed && error.response?.status !== 401) retryTimer = setTimeout(connect, 5000);
+        return;
+      }
+
+      source.addEventListener('observations', (event) => {
+        const { total } = JSON.parse(event.data);
+        setStats((current) => ({ ...current, totalObservations: current.totalObservations + total }));
+      });
+
+      source.addEventListener('stats', (event) => {
+        const counts = new Map(JSON.parse(event.data).counts.map((c) => [c.species_id, c.count]));
+        setPopulationData((current) => current.map((item) => (
+          counts.has(item.species_id) ? { ...item, count: counts.get(item.species_id) } : item
+        )));
+      });
+
+      // Reconnexion abandonnée par le navigateur (jeton expiré, 503) : nouveau jeton
+      source.onerror = () => {
+        if (source.readyState === EventSource.CLOSED && !closed) {
+          retryTimer = setTimeout(connect, 5000);
+        }
+      };
+    };
+
+    connect();
+    return () => {
+      closed = true;
+      clearTimeout(retryTimer);
+      if (source) source.close();
+    };
+  }, [headers]);
+
   if (isLoading) {
     return (
       <div style={{ textAlign: 'center', padding: '50px' }}>
@@ -1,21 +1,72 @@
-import React, { useState, useEffect } from 'react';
-import { MapContainer, TileLayer, Marker, Popup } from 'react-leaflet';
+import React, { useState, useEffect, useCallback } from 'react';
+import { MapContainer, TileLayer, Marker, Popup, CircleMarker, useMapEvents } from 'react-leaflet';
 import axios from 'axios';
 
+// En dessous de ce zoom, la carte affiche des regroupements calculés par le serveur
+const CLUSTER_MAX_ZOOM = 9;
+
+// Recharge les observations de la zone visible à chaque déplacement de la carte
+function ViewportLoader({ onViewportChange }) {
+  const map = useMapEvents({
+    moveend: () => onViewportChange(map),
+  });
+
+  useEffect(() => { onViewportChange(map); }, [map, onViewportChange]);
+
+  return null;
+}
+
 function MapView() {
   const [obs, setObs] = useState([]);
+  const [clusters, setClusters] = useState([]);
 
-  const fetchObs = async () => {
+  const fetchObs = useCallback(async (map) => {
     const token = localStorage.getItem('token');
-    const res = await axios.get('/api/observations', { headers: { Authorization: `Bearer ${token}` } });
-    setObs(res.data);
-  };
-
-  useEffect(() => { fetchObs(); }, []);
+    const bounds = map.getBounds();
+    const bbox = [
+      Math.max(bounds.getWest(), -180),
+      Math.max(bounds.getSouth(), -90),
+      Math.min(bounds.getEast(), 180),
+      Math.min(bounds.getNorth(), 90),
+    ].join(',');
+    const zoom = map.getZoom();
+    const config = {
+      headers: { Authorization: `Bearer ${token}` },
+      params: { bbox, zoom },
+    };
+    if (zoom < CLUSTER_MAX_ZOOM) {
+      const res = await axios.get('/api/observations/clusters', config);
+      setClusters(res.data.clusters);
+      setObs([]);
+    } else {
+      const res = await axios.get('/api/observations', {
+        ...config,
+        // Champs affichés par les marqueurs et leurs popups
+        params: { ...config.params, fields: 'latitude,longitude,species_id,observed_at' },
+      });
+      setObs(res.data);
+      setClusters([]);
+    }
+  }, []);
 
   return (
     <MapContainer center={[0,0]} zoom={2} style={{ height: '500px', width: '100%' }}>
       <TileLayer url="https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png" />
+      <ViewportLoader onViewportChange={fetchObs} />
+      {clusters.map(c => (
+        <CircleMarker
+          key={c.cell}
+          center={[c.lat, c.lng]}
+          radius={Math.min(6 + Math.log2(c.count) * 3, 40)}
+        >
+          <Popup>
+            {c.count} observation(s)<br />
+            {Object.entries(c.species).map(([id, count]) => (
+              <span key={id}>Espèce&nbsp;ID {id}: {count}<br /></span>
+            ))}
+          </Popup>
+        </CircleMarker>
+      ))}
       {obs.map(o => (
         <Marker key={o.id} position={[o.latitude, o.longitude]}>
           <Popup>
@@ -28,4 +79,4 @@ function MapView() {
   );
 }
 
-export default MapView;
\ No newline at end of file
+export default MapView;
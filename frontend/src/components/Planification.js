@@ -4,6 +4,9 @@ import ConservationForm from './ConservationForm';
 import ImportConservation from './ImportConservation';
 
 const API_BASE_URL = process.env.REACT_APP_API_URL || 'http://localhost:5000';
+// Champs affichés dans la liste des plans (les budgets annuels ne sont pas utilisés)
+const PLAN_LIST_FIELDS = 'espece,nom_scientifique,activite,sous_activite,responsable,'
+  + 'budget_total,date_debut_taches,date_fin_taches,duree_jours,taches';
 
 // Composant Diagramme de Gantt simple
 const GanttChart = ({ data }) => {
@@ -203,7 +206,10 @@ export default function Planification() {
     setIsLoading(true);
     try {
       // Récupérer les plans de conservation
-      const plansResponse = await axios.get(`${API_BASE_URL}/api/conservation`, headers);
+      const plansResponse = await axios.get(`${API_BASE_URL}/api/conservation`, {
+        ...headers,
+        params: { fields: PLAN_LIST_FIELDS },
+      });
       setPlans(plansResponse.data);
 
       // Récupérer les données pour le Gantt
@@ -484,18 +490,13 @@ export default function Planification() {
           {/* Plans par responsable */}
           <div>
             <h5>👥 Plans par Responsable</h5>
-            {Object.entries(rapport.responsables).map(([responsable, plans]) => (
+            {Object.entries(rapport.responsables).map(([responsable, resume]) => (
               <div key={responsable} style={{ marginBottom: '15px' }}>
                 <div style={{ fontWeight: 'bold', padding: '8px', backgroundColor: '#e9ecef', borderRadius: '4px' }}>
-                  {responsable} ({plans.length} plans)
+                  {responsable} ({resume.nombre_plans} plans)
                 </div>
-                <div style={{ marginLeft: '20px', marginTop: '5px' }}>
-                  {plans.map(plan => (
-                    <div key={plan.id} style={{ fontSize: '14px', marginBottom: '3px' }}>
-                      • {plan.espece} - {plan.activite} 
-                      ({plan.budget_total?.toLocaleString()} FCFA)
-                    </div>
-                  ))}
+                <div style={{ marginLeft: '20px', marginTop: '5px', fontSize: '14px' }}>
+                  Budget total : {resume.budget_total?.toLocaleString()} FCFA
                 </div>
               </div>
             ))}